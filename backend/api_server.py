@@ -5,7 +5,7 @@ Provides REST API endpoints for document processing
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
@@ -20,8 +20,16 @@ import pyttsx3
 import tempfile
 import json
 import base64
+import threading
+from functools import partial
 
 from document_processor import DocumentProcessor
+from generation_batcher import generation_batcher
+from summarizer_backends import summarizer_registry
+from lm_studio_client import lm_studio
+from model_registry import model_registry
+from ner_batcher import ner_batcher
+from summary_stream import summary_streams
 from encryption_utils import EncryptedStorage, get_encryption_key, ZeroKnowledgeEncryption
 from database import HistoryDatabase
 from signal_chat import SecureChatManager, SimpleE2EEClient
@@ -44,6 +52,10 @@ async def lifespan(app: FastAPI):
     db.cleanup_expired()
     logger.info("Startup cleanup complete")
     
+    # Load shared models now so the first request doesn't pay for it
+    logger.info("Warming up shared models...")
+    model_registry.warm_up()
+    
     yield
     
     # Shutdown
@@ -87,6 +99,9 @@ chat_manager = SecureChatManager()
 processing_results: Dict[str, Dict[str, Any]] = {}
 processing_status: Dict[str, str] = {}
 
+# Held while a stored result is read and replaced (background summary upgrades)
+results_lock = threading.Lock()
+
 # Temporary upload directory
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -146,11 +161,34 @@ class SummaryResponse(BaseModel):
     status: str
     summary: Optional[str] = None
     cleaned_text: Optional[str] = None
+    redactions: Optional[List[Dict]] = None
+    entities: Optional[Dict] = None
+    structured_data: Optional[Dict] = None
+    raw_text_length: Optional[int] = None
+    cleaned_text_length: Optional[int] = None
+    processing_time: Optional[float] = None
+    summary_usage: Optional[Dict] = None
+    summary_version: Optional[int] = None
+    summary_provisional: Optional[bool] = None
+
+
+class ProcessTextRequest(BaseModel):
+    text: str
+    include_summary: bool = True
+    use_ai_summary: bool = False
+
+
+class ProcessTextResponse(BaseModel):
+    status: str
+    summary: Optional[str] = None
+    cleaned_text: Optional[str] = None
+    redactions: Optional[List[Dict]] = None
     entities: Optional[Dict] = None
     structured_data: Optional[Dict] = None
     raw_text_length: Optional[int] = None
     cleaned_text_length: Optional[int] = None
     processing_time: Optional[float] = None
+    error: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -164,7 +202,14 @@ class HealthResponse(BaseModel):
 # Background Processing
 # ============================================================================
 
-def process_document_task(task_id: str, file_path: str, file_type: str, use_ai: bool = True, file_name: str = ""):
+def process_document_task(
+    task_id: str,
+    file_path: str,
+    file_type: str,
+    use_ai: bool = True,
+    file_name: str = "",
+    latency_budget: Optional[float] = None
+):
     """Background task for document processing"""
     try:
         processing_status[task_id] = "processing"
@@ -177,7 +222,9 @@ def process_document_task(task_id: str, file_path: str, file_type: str, use_ai:
         result = processor.process_document(
             file_path=file_path,
             file_type=file_type,
-            use_ai_summary=use_ai
+            use_ai_summary=use_ai,
+            task_id=task_id,
+            latency_budget=latency_budget
         )
         end_time = datetime.now()
         
@@ -215,6 +262,15 @@ def process_document_task(task_id: str, file_path: str, file_type: str, use_ai:
             db.log_activity(task_id, "process_complete", "success", f"Time: {processing_time:.2f}s")
             logger.info(f"[{task_id}] Completed successfully in {processing_time:.2f}s")
         
+        # Encrypted result is stored, stream subscribers can fetch it now
+        upgrade = processor.take_summary_upgrade(task_id)
+        if upgrade is None:
+            summary_streams.close(task_id, processing_status[task_id])
+        else:
+            # Provisional summary: the stream stays open for the AI summary replacing it
+            summary_streams.stored(task_id, result["summary_version"], True)
+            upgrade.add_done_callback(partial(apply_summary_upgrade, task_id, file_name, file_type))
+        
         # 🗑️ DELETE UPLOADED FILE IMMEDIATELY (ephemeral processing)
         try:
             if os.path.exists(file_path):
@@ -228,6 +284,9 @@ def process_document_task(task_id: str, file_path: str, file_type: str, use_ai:
         processing_status[task_id] = "failed"
         processing_results[task_id] = {"error": str(e), "encrypted": False}
         db.log_activity(task_id, "process_failed", "error", str(e))
+        # A summary still generating has nowhere to go
+        processor.take_summary_upgrade(task_id)
+        summary_streams.close(task_id, "failed")
             
     except Exception as e:
         logger.error(f"[{task_id}] Processing failed: {str(e)}")
@@ -235,6 +294,47 @@ def process_document_task(task_id: str, file_path: str, file_type: str, use_ai:
         processing_results[task_id] = {"error": str(e)}
 
 
+def apply_summary_upgrade(task_id: str, file_name: str, file_type: str, upgrade):
+    """Replace a provisional summary with the AI one from the background, as a new version"""
+    try:
+        updates = upgrade.result()
+    except Exception as e:
+        # The extractive summary stands as the final one
+        logger.error(f"[{task_id}] Background summary failed: {str(e)}")
+        updates = {"summary_provisional": False}
+    
+    with results_lock:
+        stored = processing_results.get(task_id)
+        if not stored or not stored.get("encrypted"):
+            # Results were deleted while the summary was generating
+            logger.info(f"[{task_id}] Background summary dropped, results are gone")
+            return
+        
+        result = encrypted_storage.decrypt_result(stored)
+        result.update(updates)
+        result["summary_version"] = result.get("summary_version", 1) + 1
+        encrypted_result = encrypted_storage.encrypt_result(result)
+        processing_results[task_id] = encrypted_result
+        
+        retention_policy = db.get_retention_policy()
+        try:
+            db.save_result(
+                task_id=task_id,
+                encrypted_result=json.dumps(encrypted_result),
+                file_name=file_name,
+                file_type=file_type,
+                processing_time=result.get("processing_time", 0),
+                retention_days=None if retention_policy == 'forever' else int(retention_policy)
+            )
+        except Exception as e:
+            logger.warning(f"[{task_id}] Failed to save upgraded summary to history: {e}")
+    
+    db.log_activity(task_id, "summary_upgrade", "success", f"Version {result['summary_version']}")
+    logger.info(f"[{task_id}] Summary upgraded to version {result['summary_version']}")
+    summary_streams.stored(task_id, result["summary_version"], False)
+    summary_streams.close(task_id, processing_status.get(task_id, "completed"))
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -250,6 +350,7 @@ async def root():
         "endpoints": {
             "health": "/api/health",
             "upload": "/api/upload",
+            "process_text": "/api/process_text",
             "status": "/api/status/{task_id}",
             "summary": "/api/summary/{task_id}",
             "docs": "/docs"
@@ -260,25 +361,15 @@ async def root():
 @app.get("/api/health", response_model=HealthResponse, tags=["System"])
 async def health_check():
     """Check API health and model availability"""
-    # Check models using DocumentProcessor
     import os
     try:
-        from document_processor import DocumentProcessor
-        temp_processor = DocumentProcessor(models_dir=models_dir)
-        
         # Simple model checks
         tesseract_ok = os.path.exists(r"C:\Program Files\Tesseract-OCR\tesseract.exe")
-        spacy_ok = True  # spaCy is installed in venv
+        spacy_ok = model_registry.spacy_available()
         regex_ok = True  # Regex is always available
         
-        # Check Mistral
-        mistral_ok = False
-        try:
-            import requests
-            response = requests.get("http://192.168.56.1:12345/v1/models", timeout=2)
-            mistral_ok = response.status_code == 200
-        except:
-            pass
+        # Check Mistral (LM Studio) - answered from the circuit while it is open
+        mistral_ok = lm_studio.available and await lm_studio.aprobe()
         
         return HealthResponse(
             status="healthy",
@@ -309,7 +400,8 @@ async def health_check():
 async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    use_ai_summary: bool = True
+    use_ai_summary: bool = True,
+    latency_budget: Optional[float] = None
 ):
     """
     Upload and process a medical document
@@ -322,13 +414,21 @@ async def upload_document(
     Parameters:
     - file: The document file to process
     - use_ai_summary: Use AI for summary (default: True). Set to False for simple extractive summary.
+    - latency_budget: Seconds the result may take (default: wait for the AI summary). If the
+      AI summary isn't done in time, the extractive summary is stored as provisional (version 1)
+      and replaced by the AI summary (version 2) when it finishes.
     
     Returns:
     - task_id: Unique identifier to check status and retrieve results
     - status: Current processing status
     - message: Human-readable message
+    
+    AI summary tokens can be followed live at /api/summary/{task_id}/stream
     """
     
+    if latency_budget is not None and latency_budget < 0:
+        raise HTTPException(status_code=400, detail="latency_budget must be 0 or more seconds")
+    
     # Validate file type
     file_ext = file.filename.split('.')[-1].lower()
     supported_formats = [
@@ -355,13 +455,15 @@ async def upload_document(
     
     # Start background processing
     processing_status[task_id] = "queued"
+    summary_streams.open(task_id)
     background_tasks.add_task(
         process_document_task,
         task_id=task_id,
         file_path=str(file_path),
         file_type=file_ext,
         use_ai=use_ai_summary,
-        file_name=file.filename
+        file_name=file.filename,
+        latency_budget=latency_budget
     )
     
     logger.info(f"[{task_id}] File uploaded: {file.filename} ({file_ext})")
@@ -373,6 +475,54 @@ async def upload_document(
     )
 
 
+@app.post("/api/process_text", response_model=ProcessTextResponse, tags=["Processing"])
+def process_text(request: ProcessTextRequest):
+    """
+    Process plain text synchronously and return the result in one round-trip
+
+    Runs text cleaning, entity analysis and structured-data extraction inline.
+    No file is written, no task is queued and nothing is stored.
+
+    Parameters:
+    - text: Report text to process
+    - include_summary: Also generate a summary (default: True)
+    - use_ai_summary: Use AI for summary (default: False). Extractive summary otherwise.
+
+    Returns:
+    - Same fields as /api/summary/{task_id}, without a task_id
+    """
+    # Declared without async so FastAPI runs the CPU-bound pipeline in its threadpool
+    if not request.text or not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text must not be empty")
+
+    start_time = datetime.now()
+    try:
+        result = processor.process_text(
+            text=request.text,
+            include_summary=request.include_summary,
+            use_ai_summary=request.use_ai_summary
+        )
+    except Exception as e:
+        logger.error(f"Text processing failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+    processing_time = (datetime.now() - start_time).total_seconds()
+
+    logger.info(f"Processed {len(request.text)} chars of text in {processing_time:.2f}s")
+
+    return ProcessTextResponse(
+        status="completed_with_warnings" if result.get("error") else "completed",
+        summary=result.get("summary") or None,
+        cleaned_text=result.get("cleaned_text"),
+        redactions=result.get("redactions"),
+        entities=result.get("entities"),
+        structured_data=result.get("structured_data"),
+        raw_text_length=len(result.get("raw_text", "")),
+        cleaned_text_length=len(result.get("cleaned_text", "")),
+        processing_time=processing_time,
+        error=result.get("error") or None
+    )
+
+
 @app.get("/api/status/{task_id}", response_model=StatusResponse, tags=["Processing"])
 async def get_status(task_id: str):
     """
@@ -418,11 +568,17 @@ async def get_summary(task_id: str, decrypt: bool = True):
     Returns:
     - summary: AI-generated medical summary (1-2 paragraphs, no PII)
     - cleaned_text: Preprocessed text with PII removed
-    - entities: Named entities found by spaCy
+    - redactions: Redacted spans (offset, length, category) in the original text
+    - entities: Named entities found by spaCy, grouped (persons, locations, ...)
+      as unique entries with label, count and offsets into cleaned_text
     - structured_data: Phone numbers, dates, etc. extracted by regex
     - raw_text_length: Original text character count
     - cleaned_text_length: Cleaned text character count
     - processing_time: Time taken to process (seconds)
+    - summary_usage: AI summary backend, model and prompt tokens used
+      (prompt_tokens, budget_tokens, whether the report had to be packed)
+    - summary_version: Bumped each time the stored summary is replaced
+    - summary_provisional: Extractive stand-in, the AI summary is still generating
     """
     
     if task_id not in processing_status:
@@ -456,11 +612,57 @@ async def get_summary(task_id: str, decrypt: bool = True):
         status=status,
         summary=result.get("summary"),
         cleaned_text=result.get("cleaned_text"),
+        redactions=result.get("redactions"),
         entities=result.get("entities"),
         structured_data=result.get("structured_data"),
         raw_text_length=len(result.get("raw_text", "")),
         cleaned_text_length=len(result.get("cleaned_text", "")),
-        processing_time=result.get("processing_time")
+        processing_time=result.get("processing_time"),
+        summary_usage=result.get("summary_usage"),
+        # In the clear even for encrypted results, so clients know to re-fetch
+        summary_version=encrypted_result.get("metadata", {}).get("summary_version"),
+        summary_provisional=encrypted_result.get("metadata", {}).get("summary_provisional")
+    )
+
+
+@app.get("/api/summary/{task_id}/stream", tags=["Results"])
+async def stream_summary(task_id: str):
+    """
+    Stream the AI summary as it is generated (Server-Sent Events)
+    
+    Events:
+    - token: {"text": "..."} next piece of the summary
+    - reset: {} generation restarted on another backend, discard text so far
+    - summary: {"version": n, "provisional": bool} a summary was stored; after a
+      provisional one the AI tokens keep coming until its replacement is stored
+    - done: {"status": "..."} processing finished, fetch /api/summary/{task_id}
+    
+    Tokens are held in memory only; the finished summary is encrypted and
+    stored like any other result. Connecting late replays the tokens so far.
+    """
+    if task_id not in processing_status:
+        raise HTTPException(status_code=404, detail=f"Task ID not found: {task_id}")
+    
+    async def events():
+        if not summary_streams.has_stream(task_id):
+            # Finished before the client connected (or nothing to stream)
+            yield f"event: done\ndata: {json.dumps({'status': processing_status.get(task_id)})}\n\n"
+            return
+        async for event, data in summary_streams.subscribe(task_id):
+            if event == "token":
+                payload = {"text": data}
+            elif event == "done":
+                payload = {"status": data}
+            elif event == "summary":
+                payload = data
+            else:
+                payload = {}
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
@@ -472,8 +674,10 @@ async def delete_results(task_id: str):
         raise HTTPException(status_code=404, detail=f"Task ID not found: {task_id}")
     
     # Remove from storage
-    processing_status.pop(task_id, None)
-    processing_results.pop(task_id, None)
+    with results_lock:
+        processing_status.pop(task_id, None)
+        processing_results.pop(task_id, None)
+    summary_streams.discard(task_id)
     
     logger.info(f"[{task_id}] Results deleted")
     
@@ -656,6 +860,89 @@ async def cleanup_expired():
     }
 
 
+# ============================================================================
+# Redaction Rules
+# ============================================================================
+
+@app.get("/api/redaction/rules", tags=["Redaction"])
+async def get_redaction_rules():
+    """
+    Get the active redaction rule set
+    
+    Returns the rule set version, source files and every rule's label,
+    category, priority and anchors (patterns are not exposed)
+    """
+    return processor.redaction_engine.describe()
+
+
+@app.post("/api/redaction/rules/reload", tags=["Redaction"])
+async def reload_redaction_rules():
+    """
+    Reload redaction rule files immediately
+    
+    Rule files are also picked up automatically when they change.
+    A broken rule file keeps the previous rule set active.
+    """
+    engine = processor.redaction_engine
+    if not engine.reload():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Rule files failed to load, still using {engine.ruleset.version}. Check server logs."
+        )
+    
+    return {"version": engine.ruleset.version, "rule_count": len(engine.rules), "message": "Redaction rules reloaded"}
+
+
+@app.get("/api/redaction/stats", tags=["Redaction"])
+async def get_redaction_stats(top: int = 10):
+    """
+    Get the slowest redaction rules on live traffic
+    
+    Per-rule time and match counts since startup, sorted by total time,
+    including how often each rule ran over its time budget
+    """
+    return processor.redaction_engine.slowest_rules(top=top)
+
+
+# Plain def: these block on locks and SQLite, FastAPI runs them in its threadpool
+@app.get("/api/models/status", tags=["System"])
+def get_models_status():
+    """
+    Get shared model load state and NER batching counters
+    
+    mean_batch shows how many texts each nlp.pipe call (and each batched
+    Mistral generate call) actually served.
+    mistral includes residency: loads, evictions by reason and recent
+    load/evict events. lm_studio shows the endpoint and circuit state.
+    summarizers lists the registered summarizer backends with their
+    capabilities, limits and call counters, and the order they are tried in.
+    summary_cache shows cached summaries and hit/miss counts since startup.
+    """
+    return {
+        **model_registry.status(),
+        "ner_batcher": ner_batcher.status(),
+        "hf_batcher": generation_batcher.status(),
+        "lm_studio": lm_studio.status(),
+        "summarizers": summarizer_registry.status(),
+        "summary_cache": processor.summary_cache.status()
+    }
+
+
+@app.post("/api/models/mistral/evict", tags=["System"])
+def evict_mistral():
+    """Unload the resident Mistral model now (refused while a summary is generating)"""
+    if not model_registry.mistral.evict():
+        return {"status": "not_evicted", "message": "Mistral is not loaded or is in use"}
+    return {"status": "success", "message": "Mistral unloaded"}
+
+
+@app.delete("/api/summary-cache", tags=["System"])
+def clear_summary_cache():
+    """Delete every cached AI summary, the next upload of each report runs the LLM again"""
+    removed = processor.summary_cache.clear()
+    return {"status": "success", "removed": removed}
+
+
 # ============================================================================
 # Chat API - Signal Protocol E2EE
 # ============================================================================
@@ -411,17 +411,17 @@ with tab2:
             if entities.get('persons'):
                 st.markdown("**👤 Persons:**")
                 for person in entities['persons'][:10]:
-                    st.markdown(f"• {person}")
+                    st.markdown(f"• {person['text']} ×{person['count']}")
             
             if entities.get('locations'):
                 st.markdown("**📍 Locations:**")
                 for loc in entities['locations'][:10]:
-                    st.markdown(f"• {loc}")
+                    st.markdown(f"• {loc['text']} ×{loc['count']}")
             
             if entities.get('organizations'):
                 st.markdown("**🏢 Organizations:**")
                 for org in entities['organizations'][:10]:
-                    st.markdown(f"• {org}")
+                    st.markdown(f"• {org['text']} ×{org['count']}")
             
             if not any(entities.values()):
                 st.info("No entities found")
@@ -577,7 +577,7 @@ Provide a clear summary in simple words.[/INST]"""
                         if values:
                             report += f"**{key.title()}:**\n"
                             for v in values:
-                                report += f"- {v}\n"
+                                report += f"- {v['text']} ({v['count']}×)\n"
                             report += "\n"
                 
                 if result.get("structured_data"):
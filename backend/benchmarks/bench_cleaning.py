@@ -0,0 +1,263 @@
+"""
+Cleaning-stage throughput benchmark
+Times redaction + cleaning on synthetic reports from 1 KB to 50 MB and
+writes machine-readable results that can be compared between commits
+
+Usage (from backend/):
+    python benchmarks/bench_cleaning.py
+    python benchmarks/bench_cleaning.py --sizes 1KB,100KB,1MB --output before.json
+    python benchmarks/bench_cleaning.py --compare before.json --threshold 0.10
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from redaction_engine import RedactionEngine
+from text_cleaner import StreamingCleaner, iter_lines
+from synthetic_reports import generate_report
+
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB,10MB,50MB"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+# Sizes above this are timed once, repeats would take minutes
+MAX_REPEATED_SIZE = 1024 * 1024
+
+# Rule cost changes below this are timer noise
+MIN_RULE_DELTA_MS = 1.0
+
+UNITS = {"KB": 1024, "MB": 1024 * 1024}
+
+
+def parse_size(label: str) -> int:
+    """'1KB' -> 1024, '50MB' -> 52428800, '500' -> 500"""
+    label = label.strip().upper()
+    for unit, factor in UNITS.items():
+        if label.endswith(unit):
+            return int(float(label[:-len(unit)]) * factor)
+    return int(label)
+
+
+def git_commit() -> Optional[str]:
+    """Short commit hash of the working tree, '+dirty' if it has changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return f"{commit}+dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def clean_document(cleaner: StreamingCleaner, text: str) -> Tuple[int, int]:
+    """
+    Run the cleaning stage the way _clean_text_node does
+
+    Returns:
+        (cleaned_chars, redaction_count)
+    """
+    chunks = []
+    redactions = 0
+    for chunk, chunk_redactions in cleaner.clean(iter_lines(text)):
+        if chunk:
+            chunks.append(chunk)
+        redactions += len(chunk_redactions)
+    return len(' '.join(chunks)), redactions
+
+
+def measure(
+    engine: RedactionEngine,
+    cleaner: StreamingCleaner,
+    label: str,
+    size: int,
+    seed: int,
+    repeat: int,
+    track_memory: bool
+) -> Dict[str, Any]:
+    """Benchmark one report size"""
+    text = generate_report(size, seed)
+    runs = repeat if size <= MAX_REPEATED_SIZE else 1
+
+    # Warm up regex caches and allocator on a small slice
+    clean_document(cleaner, text[:10_000])
+
+    engine.stats.reset()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        cleaned_chars, redactions = clean_document(cleaner, text)
+        timings.append(time.perf_counter() - started)
+
+    rules = [
+        {
+            "label": rule["label"],
+            "ms": round(rule["total_ms"] / runs, 3),
+            "matches": rule["matches"] // runs
+        }
+        for rule in engine.stats.report()
+    ]
+
+    # Separate run - tracemalloc slows allocation-heavy code down a lot
+    peak_memory = None
+    if track_memory:
+        tracemalloc.start()
+        clean_document(cleaner, text)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "label": label,
+        "chars": len(text),
+        "runs": runs,
+        "seconds_best": round(best, 4),
+        "seconds_median": round(statistics.median(timings), 4),
+        "chars_per_sec": round(len(text) / best) if best else None,
+        "peak_memory_bytes": peak_memory,
+        "cleaned_chars": cleaned_chars,
+        "redactions": redactions,
+        "rules": rules
+    }
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """Benchmark every requested size and collect the results"""
+    engine = RedactionEngine(budget_ms=args.budget_ms)
+    cleaner = StreamingCleaner(engine)
+
+    results = []
+    for label in args.sizes.split(","):
+        label = label.strip()
+        print(f"⏱  Cleaning {label} report...", flush=True)
+        result = measure(engine, cleaner, label, parse_size(label), args.seed, args.repeat, not args.no_memory)
+        results.append(result)
+
+        memory = f"{result['peak_memory_bytes'] / 1024**2:.1f} MB" if result["peak_memory_bytes"] is not None else "-"
+        print(
+            f"   {result['chars_per_sec'] / 1e6:.2f} M chars/sec, {result['seconds_best']:.3f}s, "
+            f"peak {memory}, {result['redactions']} redactions"
+        )
+
+    return {
+        "benchmark": "cleaning",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ruleset_version": engine.ruleset.version,
+        "rule_count": len(engine.rules),
+        "config": {
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "budget_ms": engine.budget_ms,
+            "window_chars": cleaner.window_chars,
+            "overlap_chars": cleaner.overlap_chars
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare a run against a baseline run
+
+    Throughput drops and peak memory growth beyond threshold are
+    regressions. Rule cost changes are reported for the largest size
+    both runs share, to point at the rule responsible.
+
+    Returns:
+        Descriptions of the regressions found
+    """
+    regressions = []
+    base_results = {r["label"]: r for r in baseline["results"]}
+    shared = [r for r in current["results"] if r["label"] in base_results]
+
+    print(f"\n📊 Compared with {baseline.get('git_commit')} ({baseline.get('ruleset_version')})")
+    print(f"   {'size':>8} {'chars/sec':>14} {'change':>8} {'peak MB':>9} {'change':>8}")
+    for result in shared:
+        base = base_results[result["label"]]
+        speed = result["chars_per_sec"] / base["chars_per_sec"] - 1
+        line = f"   {result['label']:>8} {result['chars_per_sec']:>14,} {speed:>+8.1%}"
+        if speed < -threshold:
+            regressions.append(f"{result['label']}: throughput {speed:+.1%}")
+
+        if result["peak_memory_bytes"] and base["peak_memory_bytes"]:
+            memory = result["peak_memory_bytes"] / base["peak_memory_bytes"] - 1
+            line += f" {result['peak_memory_bytes'] / 1024**2:>9.1f} {memory:>+8.1%}"
+            if memory > threshold and result["peak_memory_bytes"] - base["peak_memory_bytes"] > 1024**2:
+                regressions.append(f"{result['label']}: peak memory {memory:+.1%}")
+        print(line)
+
+    if shared:
+        result = max(shared, key=lambda r: r["chars"])
+        base_rules = {rule["label"]: rule for rule in base_results[result["label"]]["rules"]}
+        changes = []
+        for rule in result["rules"]:
+            before = base_rules.get(rule["label"])
+            if before is None:
+                changes.append((rule["ms"], f"{rule['label']}: new rule, {rule['ms']:.1f} ms"))
+                continue
+            delta = rule["ms"] - before["ms"]
+            if delta > MIN_RULE_DELTA_MS and delta > before["ms"] * threshold:
+                changes.append((delta, f"{rule['label']}: {before['ms']:.1f} → {rule['ms']:.1f} ms"))
+
+        if changes:
+            print(f"\n🐢 Rules costing more on {result['label']}:")
+            for _, description in sorted(changes, reverse=True):
+                print(f"   {description}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the text cleaning stage")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated report sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic report seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size up to 1MB (best is reported)")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Per-rule time budget, 0 measures full rule cost")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory run")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/cleaning-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing (default: 0.10)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Cleaning Stage Benchmark")
+    print("=" * 70)
+
+    report = run_benchmark(args)
+
+    output = args.output or RESULTS_DIR / f"cleaning-{report['git_commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n✓ Results written to {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
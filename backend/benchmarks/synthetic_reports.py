@@ -0,0 +1,114 @@
+"""
+Synthetic Indian medical reports for benchmarking the text cleaning node
+Multi-page lab reports in the repeated-label OCR format ("Label Label : : Value")
+Deterministic for a given seed, no real patient data
+"""
+
+import random
+
+FIRST_NAMES = ["RAMESH", "SUNITA", "ANIL", "PRIYA", "MALVI", "RAJESH", "KAVITA", "SANJAY", "POOJA", "VIJAY"]
+LAST_NAMES = ["SHARMA", "PATIL", "DESHMUKH", "KUMAR", "WANKHEDE", "SINGH", "JOSHI", "GAIKWAD"]
+DOCTORS = ["Dr. Abhishek Sundeepkumar Singh", "Dr. Meera Kulkarni", "Dr. Rahul Bhonsle Rao"]
+TALUKAS = ["Nagpur (urban)", "Hingna", "Kamptee", "Umred"]
+
+# (test name, unit, low, high, reference interval, decimals)
+LAB_TESTS = [
+    ("HAEMOGLOBIN", "g/dL", 8, 16, "12.0 - 15.0", 1),
+    ("Total Leucocyte Count", "/cumm", 3000, 12000, "4000 - 10000", 0),
+    ("Platelet Count", "lakhs/cumm", 1.0, 4.5, "1.5 - 4.1", 2),
+    ("Fasting Blood Sugar", "mg/dL", 70, 180, "70 - 110", 0),
+    ("Serum Creatinine", "mg/dL", 0.5, 2.0, "0.6 - 1.2", 2),
+    ("Total Cholesterol", "mg/dL", 120, 280, "< 200", 0),
+    ("SGPT (ALT)", "U/L", 10, 90, "7 - 56", 0),
+    ("Serum Uric Acid", "mg/dL", 2.5, 9.0, "3.5 - 7.2", 1),
+]
+
+INTERPRETATIONS = [
+    "Mild anaemia noted. Advised iron supplementation and follow up.",
+    "Blood sugar above reference range. Suggest HbA1c and dietary review.",
+    "All parameters within normal limits.",
+    "Raised creatinine, correlate clinically and repeat after 2 weeks.",
+]
+
+# OCR debris seen on scanned camp reports
+NOISE_LINES = ["-----------------------", "=======", "|", "ii", "* * *", "...........", "Your Logo Here"]
+
+
+def _value(r: random.Random, low: float, high: float, decimals: int) -> str:
+    return f"{r.uniform(low, high):.{decimals}f}" if decimals else str(r.randint(int(low), int(high)))
+
+
+def generate_page(r: random.Random, page_no: int) -> str:
+    """One report page: letterhead, patient block, results, signatures, footer"""
+    name = f"{r.choice(FIRST_NAMES)} {r.choice(LAST_NAMES)}"
+    gender = r.choice(["MALE", "FEMALE"])
+    age = r.randint(18, 75)
+
+    lines = [
+        "Maharashtra Building and Other Construction Workers Welfare Board",
+        f"Beneficiary Name Beneficiary {r.choice(FIRST_NAMES)}",
+        f"Patient Name Patient Name : : {name}",
+        "Register Worker Name : : Self",
+        f"Contact No Contact No : : {r.randint(6000000000, 9999999999)}",
+        f"Address Address : : House No.,P {r.randint(1, 999)} Besa Road,Nagpur,{r.randint(440001, 441999)}",
+        f"Age (Yr) Age (Yr) : : {age}",
+        f"Age/Gender : : {age}Y/{gender}",
+        f"Gender Gender : : {gender.title()}",
+        f"Registration Number Registration Number : : {r.randint(10**11, 10**12 - 1)}",
+        f"Patient ID : CWH{r.randint(10**6, 10**7)}",
+        "District District : : Nagpur",
+        f"Taluka Taluka : : {r.choice(TALUKAS)}",
+        f"Pincode Pincode : : {r.randint(440001, 441999)}",
+        "Relation With Registered Worker : : Self",
+        f"Date Of Screening Date Of Screening : : {r.randint(1, 28):02d}/11/2025",
+        f"Registered On : : {r.randint(1, 28):02d}/11/2025 {r.randint(8, 11)}:{r.randint(0, 59):02d} am",
+        f"Height (cm) Height (cm) : : {r.randint(140, 190)}",
+        f"Weight (kg) Weight (kg) : : {r.randint(40, 100)}",
+        f"Email: patient{page_no}@example.com",
+        "Test Name Result Unit Bio. Ref. Interval",
+    ]
+
+    for test, unit, low, high, interval, decimals in r.sample(LAB_TESTS, r.randint(4, len(LAB_TESTS))):
+        if r.random() < 0.2:
+            # OCR often splits the value onto its own line
+            lines.extend([test, _value(r, low, high, decimals), f"{unit} {interval}"])
+        else:
+            lines.append(f"{test} {_value(r, low, high, decimals)} {unit} {interval}")
+
+    lines.append(f"Interpretation: {r.choice(INTERPRETATIONS)}")
+    if r.random() < 0.3:
+        lines.append(r.choice(NOISE_LINES))
+
+    lines.extend([
+        f"{r.choice(DOCTORS)} MD Pathology Registration No : {r.randint(2000000000, 2099999999)}",
+        "Dr. Nitesh Nasre",
+        "Processed At : PLOT NO A/45,Back side of hotel, MIDC Hingna Nagpur",
+        "Customer Name : MBOCWWB",
+        f"D2D Camp / {r.randint(1, 999)} / Nagpur urban",
+        f"Page No - {page_no}",
+        "-----------------------",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def generate_report(size: int, seed: int = 0) -> str:
+    """
+    Generate a synthetic report of exactly `size` characters
+
+    Args:
+        size: Length of the report in characters
+        seed: Random seed, the same seed always gives the same report
+
+    Returns:
+        Report text, whole pages cut off at `size`
+    """
+    r = random.Random(seed)
+    pages = []
+    total = 0
+    page_no = 1
+    while total < size:
+        page = generate_page(r, page_no)
+        pages.append(page)
+        total += len(page)
+        page_no += 1
+    return "".join(pages)[:size]
@@ -6,19 +6,33 @@ Step-based execution with model switching and fallback logic
 from typing import TypedDict, Annotated, Literal, Callable, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage
-import re
 import os
+import time
+from contextlib import nullcontext
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
 from pathlib import Path
 import logging
 
+from model_registry import model_registry
+from models.regex_patterns import indian_data_extractor
+from ner_batcher import ner_batcher, entity_index
+from map_reduce_summary import MapReduceSummarizer, llm_slots, MAP_PROMPT
+from redaction_engine import RedactionEngine
+from summary_cache import SummaryCache, prompt_version
+from extractive_summary import textrank_summary
+from summarizer_backends import summarizer_registry, LM_STUDIO_SUMMARY_PROMPT, HF_SUMMARY_PROMPT
+from summary_stream import summary_streams
+from text_cleaner import StreamingCleaner, iter_lines
+
 # File handling
 from PIL import Image
 import pytesseract
 import PyPDF2
 import docx
 
-# ML/AI Libraries
-import spacy
+# ML/AI Libraries (spaCy is loaded once through model_registry)
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
 
@@ -26,6 +40,12 @@ from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Editing any prompt (map prompt included, it shapes long reports) invalidates cached summaries
+SUMMARY_PROMPT_VERSION = prompt_version(LM_STUDIO_SUMMARY_PROMPT, HF_SUMMARY_PROMPT, MAP_PROMPT)
+
+# AI summaries that may run past their task's latency budget at once; more wait their turn
+SUMMARY_UPGRADE_WORKERS = int(os.getenv("SUMMARY_UPGRADE_WORKERS", "4"))
+
 
 class ModelRouter:
     """Routes and switches between different AI models"""
@@ -52,11 +72,7 @@ class ModelRouter:
             return False
     
     def _check_spacy(self) -> bool:
-        try:
-            nlp = spacy.load("en_core_web_sm")
-            return True
-        except:
-            return False
+        return model_registry.spacy_available()
     
     def _check_mistral(self) -> bool:
         mistral_path = self.models_dir / "Mistral-7B-Instruct"
@@ -99,7 +115,9 @@ class ModelRouter:
         if progress_callback:
             progress_callback("🔄 Switching to LLM Model (Mistral-7B)", 75)
         
-        if self.available_models['mistral'] and state.get('use_ai_summary', False):
+        # The fake backend needs no model files, so load tests reach it without Mistral installed
+        ai_ready = self.available_models['mistral'] or "fake" in summarizer_registry.order
+        if ai_ready and state.get('use_ai_summary', False):
             logger.info("✓ Routing to Mistral-7B LLM")
             return "mistral"
         else:
@@ -120,12 +138,18 @@ class DocumentState(TypedDict):
     file_type: str
     raw_text: str
     cleaned_text: str
+    redactions: list
     entities: dict
     structured_data: dict
     summary: str
     error: str
     processing_step: str
     use_ai_summary: bool
+    task_id: str
+    summary_usage: dict
+    summary_deadline: float     # time.monotonic() the summary is due by, 0 for no deadline
+    summary_provisional: bool   # extractive stand-in, the AI summary replaces it when ready
+    summary_version: int
 
 
 class DocumentProcessor:
@@ -138,6 +162,23 @@ class DocumentProcessor:
         # Model Router - Switches between different models
         self.model_router = ModelRouter(models_dir)
         
+        # Redaction Engine - Rule files compiled for the cleaning node
+        self.redaction_engine = RedactionEngine()
+        
+        # Streaming Cleaner - Bounded windows so large documents use constant memory
+        self.text_cleaner = StreamingCleaner(self.redaction_engine)
+        
+        # Map-Reduce Summarizer - Condenses reports too long for one LLM call
+        self.map_reduce = MapReduceSummarizer(self._complete, self._simple_summary)
+        
+        # Summary Cache - Encrypted on disk, re-processed reports skip the LLM
+        self.summary_cache = SummaryCache(SUMMARY_PROMPT_VERSION)
+        
+        # Summary Upgrades - AI summaries still running after their task returned provisionally
+        self.summary_upgrades = ThreadPoolExecutor(SUMMARY_UPGRADE_WORKERS, thread_name_prefix="summary-upgrade")
+        self._pending_upgrades: Dict[str, Future] = {}
+        self._upgrades_lock = threading.Lock()
+        
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph workflow"""
         
@@ -349,156 +390,28 @@ class DocumentProcessor:
             # ==================================================================
             # COMPREHENSIVE PII REMOVAL - Handles repeated label format
             # Format: "Label Label : : Value"
+            # Rules live in redaction_rules/*.yaml, compiled once and
+            # reloaded automatically when the files change. Spans are
+            # offsets into raw_text so the redact view and audits can
+            # highlight them without re-running the rules
+            #
+            # The document is streamed through in windows of lines: each
+            # window is redacted, cleaned line by line (whitespace, special
+            # characters, separator and noise lines) and stripped of repeated
+            # header/footer segments before the next one is read
             # ==================================================================
             
-            text = raw_text
-            
-            # 1. Names - handles "Beneficiary Name Beneficiary MALVI" and "Register Worker Name : : Self"
-            text = re.sub(r'Beneficiary\s*Name\s*Beneficiary\s*[A-Z]+', '[NAME-REDACTED]', text)
-            text = re.sub(r'(?i)(patient\s*name|beneficiary\s*name|register\s*worker\s*name)[^:]*:[^:]*:\s*[^\n]+', '[NAME-REDACTED]', text)
-            text = re.sub(r'(?i)name\s*:\s*[A-Z]{3,}[A-Z\s]+', '[NAME-REDACTED]', text)
-            
-            # 2. Phone numbers - handles "Contact No Contact No : : 7057912840"
-            text = re.sub(r'(?i)contact\s*no\s*contact\s*no[^:]*:[^:]*:\s*\d{10,15}', '[PHONE-REDACTED]', text)
-            text = re.sub(r'(?i)(contact|phone|mobile)\s*(?:no\.?|number)?[^:]*:[^:]*:\s*\d{10,15}', '[PHONE-REDACTED]', text)
-            text = re.sub(r'\b\d{10}\b', '[PHONE-REDACTED]', text)
-            text = re.sub(r'[+]?\d{10,15}', '[PHONE-REDACTED]', text)
-            
-            # 3. Email addresses
-            text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL-REDACTED]', text)
-            
-            # 4. Address - handles "Address Address : : House No.,P 131besa..."
-            text = re.sub(r'(?i)address\s*address[^:]*:[^:]*:\s*House[^\n]+', '[ADDRESS-REDACTED]', text)
-            text = re.sub(r'(?i)address[^:]*:[^:]*:\s*[^\n]+\d{6}', '[ADDRESS-REDACTED]', text)
-            text = re.sub(r'House\s*No\.?[^,]+,[^,]+,\d{6}', '[ADDRESS-REDACTED]', text)
-            
-            # 5. Age - handles "Age (Yr) Age (Yr) : : 49" and "49Y/FEMALE"
-            text = re.sub(r'(?i)age\s*\([^)]+\)\s*age\s*\([^)]+\)[^:]*:[^:]*:\s*\d+', '[AGE-REDACTED]', text)
-            text = re.sub(r'(?i)age[^:]*:[^:]*:\s*\d+', '[AGE-REDACTED]', text)
-            text = re.sub(r'\d{2}Y/(?:MALE|FEMALE)', '[AGE-REDACTED]', text)
-            text = re.sub(r'Age/Gender\s*:[^:]*:\s*\d+Y/[A-Z]+', '[AGE-REDACTED]', text)
-            
-            # 6. Gender - handles "Gender Gender : : Female"
-            text = re.sub(r'(?i)gender\s*gender[^:]*:[^:]*:\s*(?:Male|Female)', '[GENDER-REDACTED]', text)
-            text = re.sub(r'(?i)gender[^:]*:[^:]*:\s*(?:Male|Female)', '[GENDER-REDACTED]', text)
-            
-            # 7. Registration/Patient IDs - handles "Registration Number Registration Number : : 313030009368"
-            text = re.sub(r'(?i)registration\s*number\s*registration\s*number[^:]*:[^:]*:\s*[A-Z0-9]+', '[ID-REDACTED]', text)
-            text = re.sub(r'(?i)(registration\s*number|patient\s*id)[^:]*:[^:]*:\s*[A-Z0-9]{8,}', '[ID-REDACTED]', text)
-            text = re.sub(r'(?i)patient\s+id\s*:\s*CWH\d+', '[PATIENT-ID-REDACTED]', text)  # Specific format
-            text = re.sub(r'\b[A-Z]{3}\d{11,15}\b', '[REPORT-ID-REDACTED]', text)
-            text = re.sub(r'CWH\d+', '[REPORT-ID-REDACTED]', text)
-            
-            # 8. Location - handles "District District : : Nagpur", "Taluka Taluka : : Nagpur (urban)"
-            text = re.sub(r'(?i)district\s*district[^:]*:[^:]*:\s*[^\n]+', '[LOCATION-REDACTED]', text)
-            text = re.sub(r'(?i)taluka\s*taluka[^:]*:[^:]*:\s*[^\n]+', '[LOCATION-REDACTED]', text)
-            text = re.sub(r'(?i)(district|taluka)[^:]*:[^:]*:\s*[^\n]+', '[LOCATION-REDACTED]', text)
-            text = re.sub(r'Maharashtra\s+India', '[LOCATION-REDACTED]', text)  # State + Country
-            text = re.sub(r'\bMaharashtra\b', '[LOCATION-REDACTED]', text)  # State name
-            text = re.sub(r'\bIndia\b', '[LOCATION-REDACTED]', text)  # Country name
-            
-            # 9. Pincode - handles "Pincode Pincode : : 440037"
-            text = re.sub(r'(?i)pincode\s*pincode[^:]*:[^:]*:\s*\d{6}', '[PINCODE-REDACTED]', text)
-            text = re.sub(r'(?i)pincode[^:]*:[^:]*:\s*\d{6}', '[PINCODE-REDACTED]', text)
-            text = re.sub(r'\b\d{6}\b', '[PINCODE-REDACTED]', text)
-            
-            # 10. Relation - handles "Relation With Registered Worker : : Self"
-            text = re.sub(r'(?i)relation\s*with[^:]*:[^:]*:\s*[^\n]+', '[RELATION-REDACTED]', text)
-            
-            # 11. Doctor names - handles "Dr. Dr Abhishek Sundeepkumar Singh"
-            text = re.sub(r'Dr\.\s*Dr\s+[A-Z][a-z]+\s+[A-Z][a-z]+\s+[A-Z][a-z]+', '[DOCTOR-REDACTED]', text)
-            text = re.sub(r'Dr\.\s*[A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?', '[DOCTOR-REDACTED]', text)
-            text = re.sub(r'(?i)Dr\s+[A-Z][a-z]+\s+[A-Z][a-z]+', '[DOCTOR-REDACTED]', text)  # Without period
-            text = re.sub(r'\b[A-Z][a-z]+\s+Nasre\b', '[DOCTOR-REDACTED]', text)  # Specific doctor names
-            text = re.sub(r'\bNitesh\s+Nasre\b', '[DOCTOR-REDACTED]', text)
-            text = re.sub(r'(?i)registration\s*no\s*:\s*\d{10}', '[DOCTOR-REG-REDACTED]', text)
-            text = re.sub(r'MD\s+Pathology', '[TITLE-REDACTED]', text)  # Medical titles
-            
-            # 12. Dates - handles "Date Of Screening Date Of Screening : : 01/11/2025"
-            text = re.sub(r'(?i)date\s*of\s*screening\s*date\s*of\s*screening[^:]*:[^:]*:\s*\d{2}/\d{2}/\d{4}', '[DATE-REDACTED]', text)
-            text = re.sub(r'(?i)(registered\s*on|reported\s*on)[^:]*:[^:]*:\s*\d{2}/\d{2}/\d{4}\s*\d{2}:\d{2}\s*[ap]m', '[DATETIME-REDACTED]', text)
-            text = re.sub(r'\d{2}/\d{2}/\d{4}', '[DATE-REDACTED]', text)
-            
-            # 13. Height/Weight - handles "Height (cm) Height (cm) : : 153"
-            text = re.sub(r'(?i)(height|weight)\s*\([^)]+\)\s*\1\s*\([^)]+\)[^:]*:[^:]*:\s*\d+', '[PHYSICAL-DATA-REDACTED]', text)
-            text = re.sub(r'(?i)(height|weight)[^:]*:[^:]*:\s*\d+', '[PHYSICAL-DATA-REDACTED]', text)
-            
-            # 14. Lab locations - "Processed At : PLOT NO A/45,Back side..."
-            text = re.sub(r'(?i)processed\s*at\s*:[^\n]+MIDC[^\n]+', '[LAB-LOCATION-REDACTED]', text)
-            text = re.sub(r'PLOT\s*NO\s*[^\n,]+,[^\n]+', '[LAB-LOCATION-REDACTED]', text)
-            text = re.sub(r'(?i)processed\s*at\s*:[^\n]+', '[LAB-LOCATION-REDACTED]', text)
-            
-            # 15. Page numbers and camp references
-            text = re.sub(r'Page\s*No\s*-\s*\d+', '', text)
-            text = re.sub(r'D2D\s*Camp\s*/\s*\d+\s*/[^\n]+', '', text)
-            
-            # 16. Customer name - "Customer Name : MBOCWWB"
-            text = re.sub(r'(?i)customer\s*name[^:]*:[^:]*:\s*[^\n]+', '[CUSTOMER-REDACTED]', text)
-            
-            logger.info(f"✓ PII removed from text ({len(raw_text)} → {len(text)} chars)")
-            
-            # Remove ONLY template placeholders (NOT our PII redaction markers)
-            text = re.sub(r'\[Your Name\]', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\[Your Company Name\]', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\[Your Address\]', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\[Your Email\]', '', text, flags=re.IGNORECASE)
-            text = re.sub(r'\[Your Phone\]', '', text, flags=re.IGNORECASE)
-            # REMOVED: text = re.sub(r'\[.*?\]', '', text) - This was removing our [REDACTED] markers!
-            
-            # Remove common template phrases
-            text = re.sub(r'(?i)your\s+logo\s+here', '', text)
-            text = re.sub(r'(?i)company\s+logo', '', text)
-            text = re.sub(r'(?i)insert\s+logo', '', text)
-            text = re.sub(r'(?i)logo\s+placeholder', '', text)
-            
-            # Remove form field labels that are just placeholders
-            text = re.sub(r'(?i)enter\s+your\s+\w+', '', text)
-            text = re.sub(r'(?i)type\s+here', '', text)
-            text = re.sub(r'(?i)click\s+to\s+add', '', text)
-            
-            # Remove watermark-like text
-            text = re.sub(r'(?i)draft|sample|template|specimen', '', text)
-            
-            # Remove extra whitespace
-            text = re.sub(r'\s+', ' ', text)
-            
-            # Remove special characters but keep basic punctuation
-            text = re.sub(r'[^\w\s.,!?;:()\-\'\"/\n]', '', text)
-            
-            # Remove multiple dots/dashes
-            text = re.sub(r'\.{3,}', '...', text)
-            text = re.sub(r'\-{2,}', '-', text)
-            
-            # Remove lines with only special characters
-            lines = text.split('\n')
-            cleaned_lines = [
-                line.strip() 
-                for line in lines 
-                if line.strip() and not all(c in '.-_=*#@' for c in line.strip())
-            ]
-            text = '\n'.join(cleaned_lines)
+            chunks = []
+            redactions = []
+            for chunk, chunk_redactions in self.text_cleaner.clean(iter_lines(raw_text)):
+                if chunk:
+                    chunks.append(chunk)
+                redactions.extend(chunk_redactions)
             
-            # Remove very short lines (likely noise)
-            lines = text.split('\n')
-            cleaned_lines = [
-                line for line in lines 
-                if len(line.strip()) > 3 or line.strip() in ['.', '!', '?']
-            ]
-            text = ' '.join(cleaned_lines)
-            
-            # Remove repeated header/footer artifacts (same text appearing 3+ times)
-            words = text.split()
-            if len(words) > 20:
-                # Check for repeated sequences
-                from collections import Counter
-                bigrams = [' '.join(words[i:i+5]) for i in range(len(words)-4)]
-                repeated = [phrase for phrase, count in Counter(bigrams).items() if count >= 3]
-                for phrase in repeated:
-                    text = text.replace(phrase, '', 1)  # Keep one occurrence only
-            
-            # Final cleanup
-            text = text.strip()
-            text = re.sub(r'\s+', ' ', text)
+            text = ' '.join(chunks)
+            state["redactions"] = redactions
+            
+            logger.info(f"✓ PII and template text removed: {len(redactions)} spans in {len(chunks)} chunks")
             
             state["cleaned_text"] = text
             logger.info(f"✓ Text cleaned: {len(raw_text)} → {len(text)} characters")
@@ -506,6 +419,7 @@ class DocumentProcessor:
         except Exception as e:
             state["error"] = f"Text cleaning error: {str(e)}"
             state["cleaned_text"] = state.get("raw_text", "")
+            state["redactions"] = []
             logger.error(f"✗ Text cleaning error: {str(e)}")
             
         return state
@@ -514,39 +428,22 @@ class DocumentProcessor:
     # NODE 3: Entity Analysis (spaCy microservice)
     # ============================================================================
     def _analyze_entities_node(self, state: DocumentState) -> DocumentState:
-        """Extract named entities using spaCy with model routing"""
+        """
+        Extract named entities using spaCy with model routing
+        
+        Writes an entity index to state: one entry per unique entity with
+        its label, occurrence count and offsets into cleaned_text
+        """
         state["processing_step"] = "Analyzing entities..."
         
         try:
             # Route to spaCy NER model
             model = self.model_router.route_to_ner_model(state)
             
-            if model == "spacy":
-                import spacy
-                nlp = spacy.load("en_core_web_sm")
-                
+            if model == "spacy" and ner_batcher.available():
                 text = state.get("cleaned_text", "")
-                doc = nlp(text)
-                
-                entities = {
-                    'persons': [],
-                    'locations': [],
-                    'organizations': [],
-                    'dates': [],
-                    'money': []
-                }
-                
-                for ent in doc.ents:
-                    if ent.label_ == "PERSON":
-                        entities['persons'].append(ent.text)
-                    elif ent.label_ in ["GPE", "LOC"]:
-                        entities['locations'].append(ent.text)
-                    elif ent.label_ == "ORG":
-                        entities['organizations'].append(ent.text)
-                    elif ent.label_ == "DATE":
-                        entities['dates'].append(ent.text)
-                    elif ent.label_ == "MONEY":
-                        entities['money'].append(ent.text)
+                # Chunked past spaCy's max_length, batched with concurrent documents
+                state["entities"] = entity_index(ner_batcher.extract_document(text))
             else:
                 state["entities"] = {}
                 logger.warning("⚠ spaCy not available, skipping NER")
@@ -569,13 +466,8 @@ class DocumentProcessor:
             # Route to Regex pattern model
             model = self.model_router.route_to_regex_model(state)
             
-            import sys
-            sys.path.insert(0, str(self.models_dir))
-            from regex_patterns import IndianDataExtractor
-            
             text = state.get("cleaned_text", "")
-            extractor = IndianDataExtractor()
-            data = extractor.extract_all(text)
+            data = indian_data_extractor.extract_all(text)
             
             state["structured_data"] = data
             logger.info(f"✓ Extracted structured data: {len(data.get('phone_numbers', []))} phones, {len(data.get('aadhaar_numbers', []))} Aadhaar numbers")
@@ -602,34 +494,25 @@ class DocumentProcessor:
             model = self.model_router.route_to_llm_model(state)
             
             if model == "mistral":
-                summary = self._try_ai_summary(text)
-                if summary:  # If we got a valid summary (not None)
-                    state["summary"] = f"""📋 AI-Generated Summary (Mistral-7B)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{summary}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-✅ Generated using Mistral-7B-Instruct (100% offline)"""
-                    logger.info("✓ Generated AI summary with Mistral-7B")
+                task_id = state.get("task_id")
+                deadline = state.get("summary_deadline", 0)
+                if deadline and task_id:
+                    upgrade = self.summary_upgrades.submit(self._ai_summary_result, text, task_id)
+                    try:
+                        updates = upgrade.result(timeout=max(deadline - time.monotonic(), 0))
+                    except FutureTimeoutError:
+                        # Over budget: answer with the extractive summary, the AI one replaces it later
+                        with self._upgrades_lock:
+                            self._pending_upgrades[task_id] = upgrade
+                        state["summary"] = self._simple_summary_block(text, "⏳ AI summary still generating, it will replace this one")
+                        state["summary_provisional"] = True
+                        logger.info("⏳ Latency budget spent, returning provisional extractive summary")
+                        return state
                 else:
-                    # Fallback to simple summarization
-                    state["summary"] = f"""📝 Simple Summary (Extractive)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{self._simple_summary(text)}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ℹ️ Mistral-7B unavailable, using extractive summary"""
-                    logger.info("→ Fallback to simple summary")
+                    updates = self._ai_summary_result(text, task_id)
+                state.update(updates)
             else:
-                state["summary"] = f"""📝 Simple Summary (Extractive)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{self._simple_summary(text)}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ℹ️ AI summary not requested"""
+                state["summary"] = self._simple_summary_block(text, "ℹ️ AI summary not requested")
                 logger.info("✓ Generated simple summary")
                 
         except Exception as e:
@@ -646,228 +529,154 @@ class DocumentProcessor:
             
         return state
     
-    def _clear_memory(self):
-        """Clear GPU and CPU memory by unloading models and running garbage collection"""
-        try:
-            import gc
-            import torch
-            
-            # Force garbage collection
-            gc.collect()
-            
-            # Clear CUDA cache if available
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-                torch.cuda.synchronize()
-                logger.info("✓ Cleared GPU memory")
-            
-            logger.info("✓ Memory cleared")
-        except Exception as e:
-            logger.warning(f"⚠ Memory clear warning: {str(e)}")
+    def _ai_summary_result(self, text: str, task_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the AI summary and return the state fields it sets
+        
+        Falls back to the extractive summary if every backend fails. Runs on
+        the calling thread, or on summary_upgrades when the task has a
+        latency budget.
+        """
+        # Tokens are streamed to subscribers of this task as they are generated
+        usage = {}
+        summary = self._try_ai_summary(text, task_id=task_id, usage=usage)
+        
+        if summary:  # If we got a valid summary (not None)
+            block = self._backend_summary_block(summary, usage)
+        else:
+            # Fallback to simple summarization
+            logger.info("→ Fallback to simple summary")
+            block = self._simple_summary_block(text, "ℹ️ AI summarizers unavailable, using extractive summary")
+        
+        # Backend, model and prompt tokens of the summary that was used
+        return {"summary": block, "summary_usage": usage, "summary_provisional": False}
     
-    def _try_lm_studio_summary(self, text: str) -> str:
-        """Try to use LM Studio local API (much faster and more stable)"""
-        try:
-            import requests
-            import json
-            
-            # LM Studio API endpoint - user's custom address
-            url = "http://192.168.56.1:12345/v1/chat/completions"
-            
-            logger.info("📡 Connecting to LM Studio at http://192.168.56.1:12345...")
-            
-            # Create medical report prompt with STRICT privacy rules
-            prompt = f"""You are a medical report analyzer. Generate a SHORT medical summary.
-
-⚠️ CRITICAL - NEVER INCLUDE:
-❌ Names (patient, doctor, beneficiary, worker)
-❌ Age, gender, physical measurements
-❌ Phone numbers, contact info
-❌ Addresses, locations, districts, pincodes
-❌ Registration numbers, IDs, report codes
-❌ Dates, times
-❌ Lab names, hospital locations
-
-✅ ONLY INCLUDE:
-• Medical test results (normal/abnormal ranges)
-• Important health findings
-• Recommendations for treatment
-
-📝 Write ONLY 1-2 SHORT paragraphs in simple language.
+    def _backend_summary_block(self, summary: str, usage: Dict[str, Any]) -> str:
+        """Frame a summary with the backend and model that produced it (from usage)"""
+        backend = summarizer_registry.get(usage.get("backend", ""))
+        name = usage.get("backend", "unknown")
+        model = usage.get("model") or "unknown model"
+        source = f"{name}, cached" if usage.get("cached") else name
+        
+        if backend is not None and backend.extractive:
+            logger.info(f"✓ Generated extractive summary with {name}")
+            return self._summary_block("📝 Simple Summary (Extractive)", summary, f"ℹ️ Sentences picked by the {source} summarizer")
+        
+        logger.info(f"✓ Generated AI summary with {name} ({model})")
+        return self._summary_block(
+            f"📋 AI-Generated Summary ({model.split('/')[-1]})",
+            summary,
+            f"✅ Generated using {model} via {source}"
+        )
+    
+    def _simple_summary_block(self, text: str, note: str) -> str:
+        return self._summary_block("📝 Simple Summary (Extractive)", self._simple_summary(text), note)
+    
+    @staticmethod
+    def _summary_block(title: str, body: str, note: str) -> str:
+        return f"""{title}
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-Medical Report Data:
-{text[:2000]}
+{body}
 
-Generate medical summary focusing ONLY on test results and health recommendations. NO personal information."""
-            
-            payload = {
-                "model": "mistral-7b-instruct",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 300,
-                "stream": False
-            }
-            
-            headers = {"Content-Type": "application/json"}
-            
-            # Send request to LM Studio
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            
-            if response.status_code == 200:
-                result = response.json()
-                summary = result["choices"][0]["message"]["content"].strip()
-                logger.info("✓ Summary generated via LM Studio")
-                return summary
-            else:
-                logger.warning(f"⚠ LM Studio returned status {response.status_code}")
-                return None
-                
-        except requests.exceptions.ConnectionError:
-            logger.warning("⚠ LM Studio not running or not accessible at http://192.168.56.1:12345")
-            return None
-        except Exception as e:
-            logger.warning(f"⚠ LM Studio error: {str(e)}")
-            return None
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{note}"""
     
-    def _try_ai_summary(self, text: str, max_length: int = 300) -> str:
-        """Try to use AI model - LM Studio first, then Hugging Face Mistral as fallback"""
+    def take_summary_upgrade(self, task_id: str) -> Optional[Future]:
+        """
+        Claim the background AI summary of a task that returned provisionally
         
-        # OPTION 1: Try LM Studio first (faster and more stable)
-        logger.info("🚀 Attempting LM Studio API...")
-        lm_studio_summary = self._try_lm_studio_summary(text)
-        if lm_studio_summary:
-            return lm_studio_summary
+        Returns:
+            Future resolving to the state fields that replace the provisional
+            summary (summary, summary_usage, summary_provisional), or None if
+            the task's summary is final
+        """
+        with self._upgrades_lock:
+            return self._pending_upgrades.pop(task_id, None)
+    
+    def _try_ai_summary(
+        self,
+        text: str,
+        max_length: int = 300,
+        task_id: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Try the configured AI backends in order (SUMMARY_BACKENDS, by default
+        LM Studio, then Hugging Face Mistral)
         
-        # OPTION 2: Fallback to Hugging Face Mistral
-        logger.info("⚠ LM Studio unavailable, trying Hugging Face Mistral...")
+        With a task_id, tokens are published to summary_streams as they are generated.
+        Summaries are cached per backend, so a report already summarized by a
+        backend that would run now is answered from the cache. usage is filled
+        with the backend, model and prompt token counts of the summary returned.
+        """
+        usage = {} if usage is None else usage
+        on_token = partial(summary_streams.publish, task_id) if task_id else None
+        backends = summarizer_registry.chain()
         
-        model = None
-        tokenizer = None
+        for backend in backends:
+            if not backend.cacheable:
+                continue
+            cached = self.summary_cache.get(text, backend.name, backend.model, self._cache_params(backend, max_length))
+            if cached:
+                logger.info(f"✓ Summary served from cache ({backend.name})")
+                usage.update(backend=backend.name, model=backend.model, cached=True)
+                if on_token:
+                    on_token(cached)
+                return cached
         
-        try:
-            import torch
-            from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
-            import gc
-            
-            logger.info("🧹 Clearing memory before loading Mistral-7B...")
-            # STEP 1: Clear all memory before loading Mistral
-            self._clear_memory()
-            
-            logger.info("📦 Loading Mistral-7B model... (This may take 2-3 minutes)")
-            logger.info("⏳ Please wait, loading tokenizer...")
-            model_name = "mistralai/Mistral-7B-Instruct-v0.2"
-            
-            # Configure quantization
-            quantization_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_use_double_quant=True,
-                bnb_4bit_quant_type="nf4"
-            )
-            
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            logger.info("✓ Tokenizer loaded")
-            logger.info("⏳ Loading model weights with 4-bit quantization... (1-2 minutes)")
-            
-            model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                quantization_config=quantization_config,
-                device_map="auto",
-                dtype=torch.float16,
-                low_cpu_mem_usage=True
-            )
-            
-            logger.info("✓ Mistral-7B loaded successfully")
-            logger.info("🤖 Generating medical summary...")
-            
-            # Create medical report prompt with STRICT privacy rules
-            prompt = f"""[INST] Medical report analyzer: Generate SHORT summary (1-2 paragraphs).
-
-⚠️ NEVER INCLUDE:
-❌ Names, age, gender
-❌ Phone, address, location
-❌ IDs, dates, report numbers
-
-✅ ONLY INCLUDE:
-• Test results (normal/abnormal)
-• Health findings
-• Recommendations
-
-Medical Data:
-{text[:2000]}
-
-Generate summary with NO personal information.[/INST]"""
-            
-            inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=2048)
-            
-            # Move inputs to same device as model
-            if torch.cuda.is_available():
-                inputs = {k: v.cuda() for k, v in inputs.items()}
-            
-            logger.info("🤖 Generating summary with Mistral-7B...")
-            with torch.no_grad():
-                outputs = model.generate(
-                    **inputs,
-                    max_new_tokens=max_length,
-                    temperature=0.7,
-                    do_sample=True,
-                    top_p=0.9,
-                    repetition_penalty=1.2
-                )
-            
-            summary = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            if "[/INST]" in summary:
-                summary = summary.split("[/INST]")[-1].strip()
-            
-            logger.info("✓ Summary generated successfully")
-            
-            # STEP 2: Unload Mistral immediately after generation
-            logger.info("🧹 Unloading Mistral-7B to free memory...")
-            del model
-            del tokenizer
-            del inputs
-            del outputs
-            
-            # Clear memory again
-            self._clear_memory()
-            logger.info("✓ Mistral-7B unloaded, memory freed")
-            
-            return summary
-            
-        except Exception as e:
-            logger.error(f"✗ Mistral-7B error: {str(e)}")
+        # Long reports are condensed chunk by chunk first so nothing is cut off
+        prompt_text = text if self.map_reduce.fits(text) else self.map_reduce.condense(text)
+        
+        for backend in backends:
+            logger.info(f"🚀 Summarizing with {backend.name} ({backend.model})...")
+            usage.clear()
+            # Counts against the same LLM concurrency limit as the map calls
+            with self._llm_slot(backend):
+                summary = backend.summarize(prompt_text, max_length, on_token if backend.streaming else None, usage)
+            if summary:
+                logger.info(f"✓ Summary generated via {backend.name} ({usage.get('prompt_tokens')} prompt tokens)")
+                if backend.cacheable:
+                    self.summary_cache.put(text, backend.name, backend.model, self._cache_params(backend, max_length), summary)
+                return summary
             
-            # Cleanup on error - be very thorough
-            try:
-                if model is not None:
-                    del model
-                if tokenizer is not None:
-                    del tokenizer
-                if 'inputs' in locals():
-                    del inputs
-                if 'outputs' in locals():
-                    del outputs
-                self._clear_memory()
-            except Exception as cleanup_error:
-                logger.warning(f"Cleanup warning: {str(cleanup_error)}")
-            
-            # Return None instead of error string to trigger fallback
-            return None
-    
-    def _simple_summary(self, text: str, max_sentences: int = 5) -> str:
-        """Simple extractive summarization fallback"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+            if task_id:
+                # The backend may have failed mid-reply, subscribers start over
+                summary_streams.reset(task_id)
+            logger.info(f"⚠ {backend.name} unavailable, trying next backend...")
         
-        summary_sentences = sentences[:max_sentences]
-        summary = '. '.join(summary_sentences)
+        usage.clear()
+        return None
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Run a plain instruction prompt on the first AI backend that can"""
+        for backend in summarizer_registry.chain():
+            if backend.completion:
+                with self._llm_slot(backend):
+                    reply = backend.complete(prompt, max_tokens)
+                if reply:
+                    return reply
+        return None
+    
+    def _cache_params(self, backend, max_length: int) -> Dict[str, Any]:
+        """Summary cache key settings: the backend's own plus the map-reduce chunk size"""
+        # Long reports are condensed in chunks of this size before the backend sees them
+        return {**backend.cache_params(max_length), "chunk_tokens": self.map_reduce.chunk_tokens}
+    
+    @staticmethod
+    def _llm_slot(backend):
+        """
+        One of the process-wide llm_slots for a backend call
         
-        if summary and not summary.endswith('.'):
-            summary += '.'
-            
-        return summary
+        Batched backends (the Hugging Face generation batcher) are exempt:
+        they queue calls themselves, and holding llm_slots would cap their
+        batches at SUMMARY_CONCURRENCY rows.
+        """
+        return nullcontext() if backend.batched else llm_slots
+    
+    def _simple_summary(self, text: str, max_sentences: int = 5) -> str:
+        """Extractive summary: TextRank over the sentences, boosted for findings and abnormal results"""
+        return textrank_summary(text, max_sentences)
     
     # ============================================================================
     # Main execution method
@@ -877,7 +686,9 @@ Generate summary with NO personal information.[/INST]"""
         file_path: str, 
         file_type: str,
         use_ai_summary: bool = True,
-        progress_callback = None
+        progress_callback = None,
+        task_id: Optional[str] = None,
+        latency_budget: Optional[float] = None
     ) -> DocumentState:
         """
         Process document through the complete pipeline
@@ -887,6 +698,10 @@ Generate summary with NO personal information.[/INST]"""
             file_type: Type of file (png, pdf, docx, txt)
             use_ai_summary: Whether to attempt AI summarization
             progress_callback: Optional callback for progress updates
+            task_id: Publish AI summary tokens to summary_streams under this ID
+            latency_budget: Seconds the whole pipeline may take. If the AI summary
+                isn't done by then (and task_id is set), the extractive summary is
+                returned as provisional; claim its replacement with take_summary_upgrade
             
         Returns:
             Final state with all processing results
@@ -898,12 +713,18 @@ Generate summary with NO personal information.[/INST]"""
             file_type=file_type,
             raw_text="",
             cleaned_text="",
+            redactions=[],
             entities={},
             structured_data={},
             summary="",
             error="",
             processing_step="Starting...",
-            use_ai_summary=use_ai_summary
+            use_ai_summary=use_ai_summary,
+            task_id=task_id or "",
+            summary_usage={},
+            summary_deadline=time.monotonic() + latency_budget if latency_budget is not None else 0,
+            summary_provisional=False,
+            summary_version=1
         )
         
         # Execute the graph
@@ -919,6 +740,53 @@ Generate summary with NO personal information.[/INST]"""
         # Return final state
         return final_state
 
+    def process_text(
+        self,
+        text: str,
+        include_summary: bool = True,
+        use_ai_summary: bool = False
+    ) -> DocumentState:
+        """
+        Process plain text synchronously without file I/O or the graph stream
+
+        Runs the cleaning, entity and structured-data nodes directly on the
+        given text. Used for callers that already hold the report as text.
+
+        Args:
+            text: Raw report text
+            include_summary: Whether to run the summarization node
+            use_ai_summary: Whether to attempt AI summarization
+
+        Returns:
+            Final state with all processing results
+        """
+        state = DocumentState(
+            file_path="",
+            file_type="text",
+            raw_text=text or "",
+            cleaned_text="",
+            redactions=[],
+            entities={},
+            structured_data={},
+            summary="",
+            error="",
+            processing_step="Starting...",
+            use_ai_summary=use_ai_summary,
+            task_id="",
+            summary_usage={},
+            summary_deadline=0,
+            summary_provisional=False,
+            summary_version=1
+        )
+
+        state = self._clean_text_node(state)
+        state = self._analyze_entities_node(state)
+        state = self._extract_structured_data_node(state)
+        if include_summary:
+            state = self._summarize_node(state)
+
+        return state
+
 
 # ============================================================================
 # Utility: Model Status Checker (Isolated service)
@@ -952,12 +820,7 @@ class ModelStatusChecker:
     
     @staticmethod
     def _check_spacy() -> bool:
-        try:
-            import spacy
-            spacy.load("en_core_web_sm")
-            return True
-        except:
-            return False
+        return model_registry.spacy_available()
     
     @staticmethod
     def _check_regex(models_dir: Path) -> bool:
@@ -147,6 +147,8 @@ class EncryptedStorage:
             "metadata": {
                 "encrypted_at": result.get("processing_time", 0),
                 "has_summary": bool(result.get("summary")),
+                "summary_version": result.get("summary_version", 1),
+                "summary_provisional": bool(result.get("summary_provisional")),
                 "has_entities": bool(result.get("entities")),
                 "has_structured_data": bool(result.get("structured_data"))
             }
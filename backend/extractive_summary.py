@@ -0,0 +1,255 @@
+"""
+Extractive Summarizer
+Ranks report sentences with TF-IDF cosine similarity and TextRank in NumPy,
+boosted for medical terms and out-of-range results, and returns the top
+ones in document order. Runs in milliseconds on CPU, no model needed.
+"""
+
+import re
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentences kept per summary
+DEFAULT_MAX_SENTENCES = 5
+
+# Shorter pieces are labels or fragments, longer ones unsplit table residue
+MIN_SENTENCE_CHARS = 20
+MAX_SENTENCE_CHARS = 400
+
+# Sentences ranked per document; past this the most promising are kept
+MAX_CANDIDATES = 800
+
+# Vocabulary size of the TF-IDF matrix, most frequent terms first
+MAX_VOCABULARY = 4000
+
+# TextRank damping factor and power-iteration limits
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# A sentence this similar to one already picked adds nothing new
+MAX_SIMILARITY = 0.8
+
+# Score multipliers on top of TextRank
+MEDICAL_TERM_BOOST = 0.5
+ABNORMAL_BOOST = 1.0
+RECOMMENDATION_BOOST = 0.5
+
+# Share of redaction placeholders and bare numbers above which a sentence
+# is header or table residue
+MAX_NOISE_SHARE = 0.4
+
+MEDICAL_TERMS = frozenset("""
+    haemoglobin hemoglobin hb glucose sugar hba1c cholesterol triglycerides hdl ldl lipid
+    creatinine urea uric bun bilirubin sgpt sgot alt ast alkaline phosphatase albumin protein
+    platelet platelets leucocyte leukocyte wbc rbc esr crp tsh t3 t4 thyroid vitamin ferritin
+    iron calcium sodium potassium chloride insulin blood pressure bp ecg urine kidney liver
+    anaemia anemia diabetes diabetic hypertension infection deficiency interpretation impression
+    diagnosis findings
+""".split())
+
+ABNORMAL_TERMS = frozenset("""
+    high low raised elevated increased decreased reduced abnormal deficient deficiency
+    borderline positive critical mild moderate severe
+""".split())
+
+RECOMMENDATION_TERMS = frozenset("""
+    recommend recommended advised advise repeat consult correlate follow review refer
+    treatment medication diet exercise
+""".split())
+
+STOPWORDS = frozenset("""
+    a an the and or of in on at to for with by from as is are was were be been it its this that
+    these those no not per name result unit units ref bio interval test value
+""".split())
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z(])|\n+')
+
+# "Serum Creatinine 1.68 mg/dL 0.6 - 1.2": test, value, unit, reference range
+_RESULT_ROW = re.compile(
+    r'(?P<test>[A-Za-z(][A-Za-z0-9()/.,\-]*(?:\s+[A-Za-z(][A-Za-z0-9()/.,\-]*){0,5}?)\s+'
+    r'(?P<value>\d+(?:\.\d+)?)\s*'
+    r'(?P<unit>[A-Za-z%µ/]+(?:/[A-Za-z]+)?\s+)?'
+    r'(?P<low>\d+(?:\.\d+)?)\s*-\s*(?P<high>\d+(?:\.\d+)?)'
+)
+
+# Column headings of result tables, dropped before splitting
+_TABLE_HEADER = re.compile(r'\b(?:Test\s+Name\s+)?Result\s+Units?\s+(?:Bio\.?\s*)?Ref(?:\.|erence)?\s*(?:Range|Interval)\b', re.IGNORECASE)
+
+_TEST_NAME = re.compile(r'[A-Za-z]{3}')
+_REDACTED = re.compile(r'\b[A-Z][A-Z-]*-REDACTED\b')
+_NOISE_TOKEN = re.compile(r'[A-Z][A-Z-]*-REDACTED\S*|[\d.:/<>-]+')
+_WORD = re.compile(r'[a-z][a-z0-9]+')
+
+
+def split_sentences(text: str) -> List[Tuple[str, bool, bool]]:
+    """
+    Split cleaned report text into sentences and lab-result rows
+
+    Cleaned text is mostly one line, so result tables come through as long
+    runs without punctuation; each "test value unit low - high" row in them
+    becomes its own sentence.
+
+    Returns:
+        (sentence, is_result, out_of_range) in document order. out_of_range
+        is True for result rows whose value lies outside their reference range.
+    """
+    sentences = []
+    for segment in _SENTENCE_SPLIT.split(_TABLE_HEADER.sub(" ", text)):
+        position = 0
+        for row in _RESULT_ROW.finditer(segment):
+            if not _TEST_NAME.search(row["test"]):
+                # A unit left over from a broken row ("mg/dL 200 1.5 - 4.1"), not a test
+                continue
+            before = segment[position:row.start()].strip()
+            if before:
+                sentences.append((before, False, False))
+            value, low, high = float(row["value"]), float(row["low"]), float(row["high"])
+            sentences.append((row.group().strip(), True, low <= high and not low <= value <= high))
+            position = row.end()
+        rest = segment[position:].strip()
+        if rest:
+            sentences.append((rest, False, False))
+
+    return [
+        (sentence, is_result, out_of_range) for sentence, is_result, out_of_range in sentences
+        if (len(sentence) >= MIN_SENTENCE_CHARS or is_result) and len(sentence) <= MAX_SENTENCE_CHARS
+    ]
+
+
+def _boosts(words: List[List[str]], out_of_range: np.ndarray, noise_share: np.ndarray) -> np.ndarray:
+    """Score multiplier per sentence from its vocabulary and result flags"""
+    medical = np.array([any(w in MEDICAL_TERMS for w in ws) for ws in words])
+    abnormal = np.array([any(w in ABNORMAL_TERMS for w in ws) for ws in words]) | out_of_range
+    advice = np.array([any(w in RECOMMENDATION_TERMS for w in ws) for ws in words])
+    boosts = 1 + MEDICAL_TERM_BOOST * medical + ABNORMAL_BOOST * abnormal + RECOMMENDATION_BOOST * advice
+    # Header residue ("NAME-REDACTED PHONE-REDACTED ...") and stray numbers are never a finding
+    return np.where(noise_share > MAX_NOISE_SHARE, 0.0, boosts)
+
+
+def _tfidf(words: List[List[str]]) -> np.ndarray:
+    """L2-normalized TF-IDF rows, one per sentence"""
+    frequency = {}
+    for ws in words:
+        for w in ws:
+            frequency[w] = frequency.get(w, 0) + 1
+    vocabulary = {w: i for i, w in enumerate(sorted(frequency, key=frequency.get, reverse=True)[:MAX_VOCABULARY])}
+
+    rows, cols = [], []
+    for row, ws in enumerate(words):
+        for w in ws:
+            col = vocabulary.get(w)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+
+    counts = np.zeros((len(words), len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(words)) / (1 + document_frequency)) + 1
+    tfidf = counts * idf.astype(np.float32)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return tfidf / np.maximum(norms, 1e-9)
+
+
+def _textrank(similarity: np.ndarray) -> np.ndarray:
+    """PageRank over the sentence similarity graph"""
+    n = len(similarity)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    out_weight = weights.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with any other link to every sentence equally
+    transition = np.where(out_weight > 0, weights / np.maximum(out_weight, 1e-9), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def rank_sentences(sentences: List[Tuple[str, bool, bool]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score sentences by TextRank centrality times their medical boosts
+
+    Args:
+        sentences: (sentence, is_result, out_of_range) from split_sentences
+
+    Returns:
+        (score per sentence, 0 for header and table residue; TF-IDF rows)
+    """
+    words = [[w for w in _WORD.findall(_REDACTED.sub(" ", s).lower()) if w not in STOPWORDS] for s, _, _ in sentences]
+    out_of_range = np.array([flag for _, _, flag in sentences], dtype=bool)
+    # Result rows are numbers by design, only loose text can be residue
+    noise_share = np.array([
+        0.0 if is_result else sum(1 for token in s.split() if _NOISE_TOKEN.fullmatch(token)) / max(len(s.split()), 1)
+        for s, is_result, _ in sentences
+    ])
+
+    tfidf = _tfidf(words)
+    centrality = _textrank(tfidf @ tfidf.T)
+    return centrality / max(centrality.max(), 1e-9) * _boosts(words, out_of_range, noise_share), tfidf
+
+
+def textrank_summary(text: str, max_sentences: int = DEFAULT_MAX_SENTENCES) -> str:
+    """
+    Extractive summary of the most central, most clinically relevant sentences
+
+    Args:
+        text: Cleaned report text
+        max_sentences: Sentences to keep
+
+    Returns:
+        Selected sentences in document order, or "" for text with no sentences
+    """
+    sentences = split_sentences(text)
+
+    # Repeated pages and templates say the same thing once
+    seen = set()
+    unique = []
+    for sentence in sentences:
+        key = " ".join(sentence[0].lower().split())
+        if key not in seen:
+            seen.add(key)
+            unique.append(sentence)
+    sentences = unique if len(unique) <= MAX_CANDIDATES else _shortlist(unique)
+    if not sentences:
+        return ""
+
+    scores, tfidf = rank_sentences(sentences)
+
+    chosen = []
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] <= 0 or len(chosen) >= max_sentences:
+            break
+        if chosen and (tfidf[chosen] @ tfidf[index]).max() > MAX_SIMILARITY:
+            continue
+        chosen.append(index)
+
+    summary = []
+    for index in sorted(chosen):
+        sentence = sentences[index][0].rstrip()
+        summary.append(sentence if sentence.endswith(('.', '!', '?')) else sentence + '.')
+    return ' '.join(summary)
+
+
+def _shortlist(sentences: List[Tuple[str, bool, bool]]) -> List[Tuple[str, bool, bool]]:
+    """Keep the MAX_CANDIDATES sentences with the most medical signal, in document order"""
+    def signal(sentence: Tuple[str, bool, bool]) -> int:
+        words = set(_WORD.findall(sentence[0].lower()))
+        return (
+            2 * sentence[2]
+            + bool(words & ABNORMAL_TERMS)
+            + bool(words & MEDICAL_TERMS)
+            + bool(words & RECOMMENDATION_TERMS)
+        )
+
+    ranked = sorted(range(len(sentences)), key=lambda i: -signal(sentences[i]))[:MAX_CANDIDATES]
+    return [sentences[i] for i in sorted(ranked)]
@@ -0,0 +1,263 @@
+"""
+Generation Batcher
+Collects prompts from concurrent tasks and runs them through the resident
+Hugging Face Mistral as one padded model.generate call per batch
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Any, List, Optional
+
+from model_registry import model_registry, ResidentModel
+
+logger = logging.getLogger(__name__)
+
+# Prompts per generate() call
+HF_BATCH_SIZE = int(os.getenv("HF_BATCH_SIZE", "4"))
+
+# How long the worker waits for more prompts before starting a batch
+HF_BATCH_MAX_WAIT_MS = float(os.getenv("HF_BATCH_MAX_WAIT_MS", "20"))
+
+# Longest a caller waits for its reply, queueing included. A prompt still
+# queued when its time is up is dropped instead of generated.
+HF_REQUEST_TIMEOUT = float(os.getenv("HF_REQUEST_TIMEOUT", "180"))
+
+# Prompt tokens kept per request (Mistral tokenizer limit used so far)
+HF_MAX_INPUT_TOKENS = 2048
+
+# Sampling settings shared by every batched request, max_new_tokens is per request
+HF_GENERATION_PARAMS = {"temperature": 0.7, "do_sample": True, "top_p": 0.9, "repetition_penalty": 1.2}
+
+
+class _Request:
+    def __init__(self, prompt: str, max_new_tokens: int, on_token: Optional[Callable[[str], None]], timeout: float):
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.on_token = on_token
+        self.deadline = time.monotonic() + timeout
+        self.future = Future()
+
+
+class _BatchStreamer:
+    """
+    Streamer for a batched generate(): sends each row's new text to its request's on_token
+
+    Implements the put/end interface of transformers' BaseStreamer. The
+    first put() is the prompt batch, later ones hold one token per row.
+    """
+
+    def __init__(self, tokenizer, requests: List[_Request]):
+        self.tokenizer = tokenizer
+        self.requests = requests
+        self.tokens = [[] for _ in requests]
+        self.sent = [0] * len(requests)
+        self.prompt_seen = False
+
+    def put(self, value):
+        if not self.prompt_seen:
+            self.prompt_seen = True
+            return
+        for row, token in enumerate(value.reshape(-1).tolist()):
+            request = self.requests[row]
+            if request.on_token is None or len(self.tokens[row]) >= request.max_new_tokens:
+                continue
+            self.tokens[row].append(token)
+            self._flush(row)
+
+    def _flush(self, row: int):
+        # Decode the whole reply so far, multi-token characters arrive complete
+        text = self.tokenizer.decode(self.tokens[row], skip_special_tokens=True)
+        if text.endswith("\ufffd"):
+            return
+        piece = text[self.sent[row]:]
+        if not piece:
+            return
+        self.sent[row] = len(text)
+        try:
+            self.requests[row].on_token(piece)
+        except Exception as e:
+            logger.warning(f"⚠ Token callback failed: {str(e)}")
+
+    def end(self):
+        pass
+
+
+class GenerationBatcher:
+    """
+    Runs Hugging Face generation for many callers through one worker thread
+
+    Callers block on generate() while the worker gathers every prompt that
+    arrives within max_wait_ms (up to batch_size), left-pads them into one
+    batch and runs a single generate() with the largest max_new_tokens.
+    Each reply is cut to its own max_new_tokens and handed back through a
+    future; tokens are streamed per row while the batch generates. The
+    worker is the only thread generating with the model.
+    """
+
+    def __init__(
+        self,
+        resident: ResidentModel = model_registry.mistral,
+        batch_size: int = HF_BATCH_SIZE,
+        max_wait_ms: float = HF_BATCH_MAX_WAIT_MS,
+        timeout: float = HF_REQUEST_TIMEOUT,
+        generation_params: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            resident: Resident model yielding (model, tokenizer)
+            batch_size: Maximum prompts per generate() call
+            max_wait_ms: Time to wait for more prompts once one arrived
+            timeout: Default seconds a caller waits for its reply
+            generation_params: Sampling settings for every request
+        """
+        self.resident = resident
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.generation_params = generation_params or HF_GENERATION_PARAMS
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+        # Counters for status reporting
+        self.batches = 0
+        self.requests = 0
+        self.expired = 0
+        self.busy_seconds = 0.0
+
+    def generate(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Generate a reply, batched with other callers' prompts
+
+        Args:
+            prompt: Full prompt, chat markup included
+            max_new_tokens: Reply token budget
+            on_token: Called with each piece of text as it is generated
+            timeout: Seconds to wait for the reply (default: the batcher's)
+
+        Returns:
+            Reply text without the prompt
+
+        Raises:
+            TimeoutError: If the reply took longer than timeout
+            RuntimeError: If the model could not be loaded
+        """
+        timeout = self.timeout if timeout is None else timeout
+        request = _Request(prompt, max_new_tokens, on_token, timeout)
+        self._ensure_worker()
+        self._queue.put(request)
+        try:
+            return request.future.result(timeout)
+        except FutureTimeoutError:
+            # Not picked up yet: the worker skips it
+            request.future.cancel()
+            raise
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="hf-generation-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_Request]:
+        """Block for one request, then gather more until the batch is full or max_wait passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            collected = self._collect()
+            now = time.monotonic()
+            batch = []
+            for request in collected:
+                if now >= request.deadline:
+                    self.expired += 1
+                    request.future.cancel()
+                if request.future.set_running_or_notify_cancel():
+                    batch.append(request)
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                self._generate_batch(batch)
+            except Exception as e:
+                logger.error(f"✗ Generation batch of {len(batch)} failed: {str(e)}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+            elapsed = time.perf_counter() - started
+            self.batches += 1
+            self.requests += len(batch)
+            self.busy_seconds += elapsed
+            logger.info(f"🤖 Generated {len(batch)} replies in one batch in {elapsed:.1f}s")
+
+    def _generate_batch(self, batch: List[_Request]):
+        import torch
+
+        with self.resident.use() as (model, tokenizer):
+            # Decoder-only models continue from the right, so pad on the left
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+
+            inputs = tokenizer(
+                [request.prompt for request in batch],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=HF_MAX_INPUT_TOKENS
+            )
+            inputs = {k: v.to(model.device) for k, v in inputs.items()}
+            streamer = _BatchStreamer(tokenizer, batch) if any(r.on_token for r in batch) else None
+
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs,
+                    **self.generation_params,
+                    max_new_tokens=max(request.max_new_tokens for request in batch),
+                    pad_token_id=tokenizer.pad_token_id,
+                    streamer=streamer
+                )
+
+            prompt_length = inputs["input_ids"].shape[1]
+            for row, request in enumerate(batch):
+                reply = outputs[row, prompt_length:prompt_length + request.max_new_tokens]
+                request.future.set_result(tokenizer.decode(reply, skip_special_tokens=True).strip())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "timeout": self.timeout,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch": round(self.requests / self.batches, 2) if self.batches else None,
+            "expired": self.expired,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "queued": self._queue.qsize()
+        }
+
+
+# Shared by every DocumentProcessor in the process
+generation_batcher = GenerationBatcher()
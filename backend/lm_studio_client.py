@@ -0,0 +1,306 @@
+"""
+LM Studio Client
+Pooled keep-alive HTTP client for the LM Studio OpenAI-compatible API with
+a circuit breaker, so a stopped LM Studio costs nothing per request
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LM_STUDIO_URL = os.getenv("LM_STUDIO_URL", "http://192.168.56.1:12345")
+LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "mistral-7b-instruct")
+LM_STUDIO_CONNECT_TIMEOUT = float(os.getenv("LM_STUDIO_CONNECT_TIMEOUT", "2"))
+LM_STUDIO_READ_TIMEOUT = float(os.getenv("LM_STUDIO_READ_TIMEOUT", "60"))
+
+# Consecutive failures that open the circuit
+LM_STUDIO_FAILURE_THRESHOLD = int(os.getenv("LM_STUDIO_FAILURE_THRESHOLD", "3"))
+
+# How often an open circuit re-probes LM Studio in the background
+LM_STUDIO_PROBE_SECONDS = float(os.getenv("LM_STUDIO_PROBE_SECONDS", "30"))
+
+# Keep-alive connections held open to LM Studio
+MAX_CONNECTIONS = 8
+
+
+class LMStudioError(Exception):
+    """LM Studio answered, but not with a readable completion"""
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures of a backend
+
+    After failure_threshold failures in a row the circuit opens and callers
+    skip the backend. It closes again on the next success, which normally
+    comes from the background probe.
+    """
+
+    def __init__(self, failure_threshold: int):
+        self.failure_threshold = failure_threshold
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.last_error = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def record_success(self) -> bool:
+        """Returns True if this closed an open circuit"""
+        with self._lock:
+            was_open = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            return was_open
+
+    def record_failure(self, error: str) -> bool:
+        """Returns True if this failure opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.opened_at is None and self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                self.times_opened += 1
+                return True
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self.failures,
+            "open_seconds": round(time.time() - self.opened_at) if self.opened_at else None,
+            "times_opened": self.times_opened,
+            "last_error": self.last_error
+        }
+
+
+class LMStudioClient:
+    """
+    Chat completions against LM Studio over pooled keep-alive connections
+
+    Connection errors, timeouts, 5xx responses and malformed replies count
+    against the circuit breaker. While the circuit is open chat() returns None immediately and
+    a background thread probes /v1/models until LM Studio answers again.
+    """
+
+    def __init__(
+        self,
+        base_url: str = LM_STUDIO_URL,
+        model: str = LM_STUDIO_MODEL,
+        connect_timeout: float = LM_STUDIO_CONNECT_TIMEOUT,
+        read_timeout: float = LM_STUDIO_READ_TIMEOUT,
+        failure_threshold: int = LM_STUDIO_FAILURE_THRESHOLD,
+        probe_interval: float = LM_STUDIO_PROBE_SECONDS
+    ):
+        """
+        Args:
+            base_url: LM Studio server, e.g. http://localhost:1234
+            model: Model name sent with each request
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for a response (generation time)
+            failure_threshold: Consecutive failures that open the circuit
+            probe_interval: Seconds between background probes while open
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.probe_interval = probe_interval
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.breaker = CircuitBreaker(failure_threshold)
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+        )
+        self._async_client = None
+        self._prober = None
+        self._prober_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit is open"""
+        return not self.breaker.is_open
+
+    def chat(self, messages: List[Dict[str, str]], timeout: Optional[float] = None, **params) -> Optional[str]:
+        """
+        Run a chat completion
+
+        Args:
+            messages: OpenAI-style messages
+            timeout: Read timeout for this request (default: the client's)
+            **params: Extra request fields (temperature, max_tokens, ...)
+
+        Returns:
+            Reply text, or None if LM Studio is unavailable or failed
+
+        Raises:
+            LMStudioError: The reply was not a valid completion
+        """
+        if self.breaker.is_open:
+            logger.debug("LM Studio circuit open, skipping")
+            return None
+
+        payload = {"model": self.model, "messages": messages, "stream": False, **params}
+        try:
+            response = self._client.post("/v1/chat/completions", json=payload, timeout=self._request_timeout(timeout))
+        except httpx.HTTPError as e:
+            self._failure(f"{type(e).__name__}: {str(e) or 'no response'}")
+            return None
+
+        if response.status_code >= 500:
+            self._failure(f"HTTP {response.status_code}")
+            return None
+        if response.status_code != 200:
+            # The request was rejected, LM Studio itself is up
+            logger.warning(f"⚠ LM Studio returned status {response.status_code}")
+            self.breaker.record_success()
+            return None
+
+        try:
+            content = response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise self._malformed("reply", e)
+
+        self.breaker.record_success()
+        return content.strip()
+
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        on_token: Callable[[str], None],
+        timeout: Optional[float] = None,
+        **params
+    ) -> Optional[str]:
+        """
+        Run a chat completion with "stream": true
+
+        Args:
+            messages: OpenAI-style messages
+            on_token: Called with each piece of text as it arrives
+            timeout: Read timeout for this request (default: the client's)
+            **params: Extra request fields (temperature, max_tokens, ...)
+
+        Returns:
+            Full reply text, or None if LM Studio is unavailable or failed
+            (on_token may already have been called with part of a reply)
+
+        Raises:
+            LMStudioError: A streamed chunk was not valid JSON or not a completion chunk
+        """
+        if self.breaker.is_open:
+            logger.debug("LM Studio circuit open, skipping")
+            return None
+
+        payload = {"model": self.model, "messages": messages, "stream": True, **params}
+        parts = []
+        try:
+            with self._client.stream("POST", "/v1/chat/completions", json=payload, timeout=self._request_timeout(timeout)) as response:
+                if response.status_code >= 500:
+                    self._failure(f"HTTP {response.status_code}")
+                    return None
+                if response.status_code != 200:
+                    logger.warning(f"⚠ LM Studio returned status {response.status_code}")
+                    self.breaker.record_success()
+                    return None
+
+                # Server-sent events: "data: {chunk}" lines, ending with "data: [DONE]"
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                        # json.JSONDecodeError is a ValueError
+                        raise self._malformed("stream chunk", e)
+                    if delta:
+                        parts.append(delta)
+                        on_token(delta)
+        except httpx.HTTPError as e:
+            self._failure(f"{type(e).__name__}: {str(e) or 'no response'}")
+            return None
+
+        self.breaker.record_success()
+        return "".join(parts).strip()
+
+    def _request_timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        return self.timeout if timeout is None else httpx.Timeout(timeout, connect=self.timeout.connect)
+
+    def probe(self) -> bool:
+        """Check LM Studio is answering, updating the circuit"""
+        try:
+            response = self._client.get("/v1/models", timeout=self.timeout.connect)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        return self._probe_result(ok)
+
+    async def aprobe(self) -> bool:
+        """probe() for async callers, over a pooled async client"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        try:
+            response = await self._async_client.get("/v1/models", timeout=self.timeout.connect)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        return self._probe_result(ok)
+
+    def _probe_result(self, ok: bool) -> bool:
+        if ok:
+            if self.breaker.record_success():
+                logger.info(f"✓ LM Studio back at {self.base_url}, circuit closed")
+        elif not self.breaker.is_open:
+            self._failure("probe failed")
+        return ok
+
+    def _malformed(self, what: str, error: Exception) -> LMStudioError:
+        """Count a malformed reply against the breaker, returns the error to raise"""
+        message = f"malformed {what}: {type(error).__name__}: {error}"
+        self._failure(message)
+        return LMStudioError(message)
+
+    def _failure(self, error: str):
+        if self.breaker.record_failure(error):
+            logger.warning(
+                f"⚠ LM Studio at {self.base_url} failed {self.breaker.failures} times ({error}), "
+                f"skipping it and re-probing every {self.probe_interval:.0f}s"
+            )
+            self._start_prober()
+        else:
+            logger.warning(f"⚠ LM Studio error: {error}")
+
+    def _start_prober(self):
+        with self._prober_lock:
+            if self._prober is None or not self._prober.is_alive():
+                self._prober = threading.Thread(target=self._probe_loop, name="lm-studio-probe", daemon=True)
+                self._prober.start()
+
+    def _probe_loop(self):
+        while self.breaker.is_open:
+            time.sleep(self.probe_interval)
+            self.probe()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "model": self.model,
+            "connect_timeout": self.timeout.connect,
+            "read_timeout": self.timeout.read,
+            "circuit": self.breaker.status()
+        }
+
+
+# Shared by every DocumentProcessor and the health check
+lm_studio = LMStudioClient()
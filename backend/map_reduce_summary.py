@@ -0,0 +1,196 @@
+"""
+Map-Reduce Summarization
+Long reports are split into token-budgeted chunks, each chunk is condensed
+to its medical findings concurrently, and the findings are reduced until
+they fit a single summarization call
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Report tokens per LLM call, leaves room for the prompt and the reply
+# in Mistral's context (and the 2048-token HF tokenizer limit)
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1500"))
+
+# LLM calls running at once across the whole process
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "2"))
+
+# Chunk summaries kept for re-runs of the same text
+SUMMARY_CHUNK_CACHE_SIZE = int(os.getenv("SUMMARY_CHUNK_CACHE_SIZE", "1024"))
+
+# Lab reports are digit-heavy, which tokenizes denser than prose
+CHARS_PER_TOKEN = 3
+
+# Map rounds before the notes are cut to fit
+MAX_REDUCE_LEVELS = 4
+
+# Reply budget for one chunk's notes
+MAP_MAX_TOKENS = 200
+
+# Bump when MAP_PROMPT changes so cached chunk summaries aren't reused
+MAP_PROMPT_VERSION = "1"
+
+MAP_PROMPT = """You are reading one part of a longer medical report.
+List the medical findings in this part as short bullet points:
+• Test results with their values and whether they are normal or abnormal
+• Diagnoses, health findings and recommendations
+
+NEVER include names, age, gender, phone numbers, addresses, IDs or dates.
+If this part has no medical findings, reply with "None".
+
+Report part:
+{text}"""
+
+_SENTENCE_END = re.compile(r'[.!?]\s+')
+
+# Shared by every summarizer so concurrent documents don't oversubscribe the LLM
+# (backends that batch their own calls don't take one)
+llm_slots = threading.BoundedSemaphore(SUMMARY_CONCURRENCY)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without loading a tokenizer"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_by_tokens(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens, cut at sentence ends (else spaces)"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + max_chars
+        if end < len(text):
+            cut = None
+            for match in _SENTENCE_END.finditer(text, start + max_chars // 2, end):
+                cut = match.end()
+            if cut is None:
+                space = text.rfind(' ', start + max_chars // 2, end)
+                cut = space + 1 if space >= 0 else end
+            end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
+
+
+class ChunkSummaryCache:
+    """In-memory LRU of chunk summaries keyed by prompt version and chunk text"""
+
+    def __init__(self, max_entries: int = SUMMARY_CHUNK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(chunk: str) -> str:
+        return hashlib.sha256(f"{MAP_PROMPT_VERSION}\0{chunk}".encode("utf-8")).hexdigest()
+
+    def get(self, chunk: str) -> Optional[str]:
+        key = self.key(chunk)
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def put(self, chunk: str, summary: str):
+        key = self.key(chunk)
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def status(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+class MapReduceSummarizer:
+    """
+    Condenses text that is too long for one summarization call
+
+    Map: every chunk is summarized to bullet-point findings, up to
+    `concurrency` chunks at a time; `complete` holds one of llm_slots per
+    LLM call, so the process-wide limit still applies. Reduce: the findings are joined and,
+    while still over budget, mapped again. The result fits one call.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str, int], Optional[str]],
+        fallback: Callable[[str], str],
+        chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+        concurrency: int = SUMMARY_CONCURRENCY,
+        cache: Optional[ChunkSummaryCache] = None
+    ):
+        """
+        Args:
+            complete: Runs a prompt with a reply token budget, None on failure
+                (takes its own llm_slots slot, unless the backend batches)
+            fallback: Extractive summary for a chunk the LLM failed on
+            chunk_tokens: Token budget per LLM call
+            concurrency: Chunks summarized at once per document
+            cache: Chunk summary cache (a private one by default)
+        """
+        self.complete = complete
+        self.fallback = fallback
+        self.chunk_tokens = chunk_tokens
+        self.concurrency = concurrency
+        self.cache = cache or ChunkSummaryCache()
+
+    def fits(self, text: str) -> bool:
+        return estimate_tokens(text) <= self.chunk_tokens
+
+    def condense(self, text: str) -> str:
+        """
+        Reduce text until it fits one summarization call
+
+        Returns:
+            text unchanged if it already fits, else the combined findings
+        """
+        level = 0
+        while not self.fits(text) and level < MAX_REDUCE_LEVELS:
+            chunks = split_by_tokens(text, self.chunk_tokens)
+            logger.info(f"🗂 Map-reduce level {level + 1}: summarizing {len(chunks)} chunks")
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="summary-map") as pool:
+                notes = list(pool.map(self._summarize_chunk, chunks))
+            text = "\n".join(note for note in notes if note)
+            level += 1
+
+        if not self.fits(text):
+            logger.warning(f"⚠ Findings still over {self.chunk_tokens} tokens after {level} rounds, truncating")
+            text = text[:self.chunk_tokens * CHARS_PER_TOKEN]
+        return text
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        cached = self.cache.get(chunk)
+        if cached is not None:
+            return cached
+
+        notes = self.complete(MAP_PROMPT.format(text=chunk), MAP_MAX_TOKENS)
+
+        if not notes:
+            # Keep something from this part rather than dropping it, but don't cache it
+            logger.warning("⚠ Chunk summary failed, using extractive summary for it")
+            return self.fallback(chunk)
+
+        notes = notes.strip()
+        if notes.lower().rstrip(".") == "none":
+            notes = ""
+        self.cache.put(chunk, notes)
+        return notes
@@ -0,0 +1,394 @@
+"""
+Process-wide Model Registry
+Heavy models are loaded once per process and shared by every component
+spaCy is loaded with only the components NER needs, Mistral stays
+resident between requests until idle or under memory pressure
+"""
+
+import gc
+import os
+import time
+import logging
+import threading
+import importlib.util
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+
+# Pipeline components entity extraction never uses
+SPACY_EXCLUDED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
+
+# Unload Mistral after this many seconds without a request (0 = never)
+MISTRAL_IDLE_SECONDS = float(os.getenv("MISTRAL_IDLE_SECONDS", "900"))
+
+# Unload an idle resident model when free RAM or GPU memory drops below
+# this fraction of the total (0 = never)
+MIN_FREE_MEMORY_FRACTION = float(os.getenv("MIN_FREE_MEMORY_FRACTION", "0.10"))
+
+# Don't retry a failed load for this long, every request would pay for it
+LOAD_RETRY_SECONDS = 300
+
+# Free-memory drop since load that counts as pressure from other processes
+MEMORY_PRESSURE_MARGIN = 0.02
+
+# How often resident models are checked for idleness and memory pressure
+RESIDENCY_CHECK_SECONDS = 15
+
+# Load/evict events kept for the status endpoint
+MAX_MODEL_EVENTS = 50
+
+
+def _free_memory_fractions() -> Dict[str, float]:
+    """Free fraction of system RAM (needs psutil) and GPU memory (needs CUDA)"""
+    fractions = {}
+    try:
+        import psutil
+        memory = psutil.virtual_memory()
+        fractions["ram"] = memory.available / memory.total
+    except ImportError:
+        pass
+    try:
+        import torch
+        if torch.cuda.is_available():
+            free, total = torch.cuda.mem_get_info()
+            fractions["gpu"] = free / total
+    except ImportError:
+        pass
+    return fractions
+
+
+def _release_memory():
+    """Return freed model memory to the system"""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+def _load_mistral():
+    """Load Mistral-7B-Instruct with 4-bit quantization"""
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+
+    quantization_config = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_compute_dtype=torch.float16,
+        bnb_4bit_use_double_quant=True,
+        bnb_4bit_quant_type="nf4"
+    )
+    tokenizer = AutoTokenizer.from_pretrained(MISTRAL_MODEL)
+    model = AutoModelForCausalLM.from_pretrained(
+        MISTRAL_MODEL,
+        quantization_config=quantization_config,
+        device_map="auto",
+        dtype=torch.float16,
+        low_cpu_mem_usage=True
+    )
+    model.eval()
+    return model, tokenizer
+
+
+class ResidentModel:
+    """
+    Keeps a heavy model loaded across requests
+
+    The model loads on first use and stays resident. A background thread
+    unloads it once it has been idle for idle_seconds, or while it is idle
+    and free RAM/GPU memory is below min_free_fraction and lower than it
+    was right after loading (the model's own footprint doesn't count as
+    pressure). A model in use is never unloaded. Loads and evictions are recorded as events.
+
+    The lock is not held while the loader runs, so evict(), status and the
+    watcher never wait out a multi-minute load; other first users wait on
+    a condition until the one load in progress finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        idle_seconds: float,
+        min_free_fraction: float = MIN_FREE_MEMORY_FRACTION
+    ):
+        """
+        Args:
+            name: Model name for logs and status
+            loader: Returns the loaded model (any object)
+            idle_seconds: Idle time before eviction, 0 keeps it loaded
+            min_free_fraction: Free memory below which an idle model is evicted
+        """
+        self.name = name
+        self.loader = loader
+        self.idle_seconds = idle_seconds
+        self.min_free_fraction = min_free_fraction
+        self._lock = threading.Lock()
+        self._loaded = threading.Condition(self._lock)
+        self._loading = False
+        self._model = None
+        self._in_use = 0
+        self._last_used = None
+        self._failed_at = None
+        self._last_error = None
+        self._watcher = None
+        self._free_after_load = {}
+
+        self.loads = 0
+        self.load_seconds = None
+        self.evictions = {"idle": 0, "memory": 0, "manual": 0}
+        self.events = deque(maxlen=MAX_MODEL_EVENTS)
+
+    def _event(self, event: str, **details):
+        self.events.append({"event": event, "at": datetime.now().isoformat(timespec="seconds"), **details})
+
+    @contextmanager
+    def use(self):
+        """
+        Borrow the model, loading it if it is not resident
+
+        Raises:
+            RuntimeError: If the model failed to load recently
+        """
+        with self._lock:
+            while self._model is None:
+                if self._loading:
+                    # Another request is loading it
+                    self._loaded.wait()
+                else:
+                    self._load()
+            self._in_use += 1
+            model = self._model
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+
+    def _load(self):
+        # Called with the lock held; _loading makes concurrent first requests
+        # wait instead of loading again while the lock is released
+        if self._failed_at is not None and time.monotonic() - self._failed_at < LOAD_RETRY_SECONDS:
+            raise RuntimeError(f"{self.name} failed to load recently: {self._last_error}")
+
+        logger.info(f"📦 Loading {self.name}... (kept resident between requests)")
+        self._loading = True
+        self._lock.release()
+        started = time.perf_counter()
+        try:
+            model = self.loader()
+            error = None
+        except Exception as e:
+            model = None
+            error = e
+        finally:
+            self._lock.acquire()
+            self._loading = False
+            self._loaded.notify_all()
+
+        if error is not None:
+            self._failed_at = time.monotonic()
+            self._last_error = str(error)
+            self._event("load_failed", error=str(error))
+            _release_memory()
+            raise error
+
+        self._model = model
+        self._failed_at = None
+        self._free_after_load = _free_memory_fractions()
+        self.loads += 1
+        self.load_seconds = time.perf_counter() - started
+        self._event("load", seconds=round(self.load_seconds, 2))
+        logger.info(f"✓ {self.name} loaded in {self.load_seconds:.1f}s")
+        self._ensure_watcher()
+
+    def _ensure_watcher(self):
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch, name=f"{self.name}-residency", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(RESIDENCY_CHECK_SECONDS)
+            with self._lock:
+                if self._model is None:
+                    return
+                if self._in_use:
+                    continue
+                idle = time.monotonic() - self._last_used if self._last_used is not None else 0
+                if self.idle_seconds and idle >= self.idle_seconds:
+                    self._evict("idle", idle_seconds=round(idle))
+                    return
+                low = {
+                    kind: round(fraction, 3)
+                    for kind, fraction in _free_memory_fractions().items()
+                    if fraction < self.min_free_fraction
+                    and fraction < self._free_after_load.get(kind, 1.0) - MEMORY_PRESSURE_MARGIN
+                }
+                if low:
+                    self._evict("memory", free=low)
+                    return
+
+    def _evict(self, reason: str, **details):
+        # Called with the lock held
+        self._model = None
+        _release_memory()
+        self.evictions[reason] += 1
+        self._event("evict", reason=reason, **details)
+        logger.info(f"🧹 {self.name} unloaded ({reason})")
+
+    def evict(self) -> bool:
+        """Unload the model now unless it is in use"""
+        with self._lock:
+            if self._model is None or self._in_use:
+                return False
+            self._evict("manual")
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        idle = time.monotonic() - self._last_used if self._last_used is not None and self._model is not None else None
+        return {
+            "loaded": self._model is not None,
+            "loading": self._loading,
+            "in_use": self._in_use,
+            "idle_seconds": round(idle) if idle is not None else None,
+            "evict_after_idle_seconds": self.idle_seconds,
+            "min_free_memory_fraction": self.min_free_fraction,
+            "loads": self.loads,
+            "last_load_seconds": round(self.load_seconds, 2) if self.load_seconds else None,
+            "evictions": dict(self.evictions),
+            "last_error": self._last_error,
+            "events": list(self.events)
+        }
+
+
+class ModelRegistry:
+    """Loads shared models on first use and keeps them for the life of the process"""
+
+    def __init__(self, spacy_model: str = SPACY_MODEL):
+        self.spacy_model = spacy_model
+        self._lock = threading.Lock()
+        self._nlp = None
+        self._spacy_error = None
+        self._spacy_load_seconds = None
+        self.mistral = ResidentModel("Mistral-7B", _load_mistral, MISTRAL_IDLE_SECONDS)
+        self._tokenizer = None
+        self._tokenizer_error = None
+
+    def get_spacy(self):
+        """
+        Get the shared spaCy pipeline, loading it on first call
+
+        Returns:
+            spaCy Language object, or None if the model cannot be loaded
+        """
+        if self._nlp is not None or self._spacy_error is not None:
+            return self._nlp
+
+        with self._lock:
+            if self._nlp is None and self._spacy_error is None:
+                self._load_spacy()
+        return self._nlp
+
+    def _load_spacy(self):
+        started = time.perf_counter()
+        try:
+            import spacy
+            nlp = spacy.load(self.spacy_model, exclude=SPACY_EXCLUDED_COMPONENTS)
+
+            # tok2vec only feeds the excluded components unless ner listens to it
+            if "tok2vec" in nlp.pipe_names and "ner" not in nlp.get_pipe("tok2vec").listening_components:
+                nlp.remove_pipe("tok2vec")
+
+            self._nlp = nlp
+            self._spacy_load_seconds = time.perf_counter() - started
+            logger.info(
+                f"✓ spaCy {self.spacy_model} loaded in {self._spacy_load_seconds:.2f}s "
+                f"(pipeline: {', '.join(nlp.pipe_names)})"
+            )
+        except Exception as e:
+            # Remember the failure so every document doesn't retry the load
+            self._spacy_error = str(e)
+            logger.warning(f"⚠ spaCy {self.spacy_model} not available: {str(e)}")
+
+    def get_tokenizer(self):
+        """
+        Get the Mistral tokenizer for counting prompt tokens, loading it on first call
+
+        Loaded separately from the model so counting never loads (or keeps)
+        Mistral itself.
+
+        Returns:
+            Tokenizer, or None if it cannot be loaded
+        """
+        if self._tokenizer is not None or self._tokenizer_error is not None:
+            return self._tokenizer
+
+        with self._lock:
+            if self._tokenizer is None and self._tokenizer_error is None:
+                try:
+                    from transformers import AutoTokenizer
+                    self._tokenizer = AutoTokenizer.from_pretrained(MISTRAL_MODEL)
+                    logger.info(f"✓ Tokenizer for {MISTRAL_MODEL} loaded")
+                except Exception as e:
+                    # Remember the failure, callers fall back to estimates
+                    self._tokenizer_error = str(e)
+                    logger.warning(f"⚠ Tokenizer for {MISTRAL_MODEL} not available: {str(e)}")
+        return self._tokenizer
+
+    def spacy_available(self) -> bool:
+        """
+        Whether the spaCy model can be used, without loading it
+
+        Checks that spaCy and the model package are installed; a model that
+        already failed to load counts as unavailable.
+        """
+        if self._nlp is not None:
+            return True
+        if self._spacy_error is not None:
+            return False
+        if importlib.util.find_spec("spacy") is None:
+            return False
+        try:
+            import spacy
+            return spacy.util.is_package(self.spacy_model) or os.path.isdir(self.spacy_model)
+        except Exception:
+            return False
+
+    def warm_up(self):
+        """Load shared models and run a tiny input through them (call at startup)"""
+        nlp = self.get_spacy()
+        if nlp is not None:
+            nlp("Warm up the NER pipeline.")
+
+    def status(self) -> Dict[str, Any]:
+        """Load state of every shared model"""
+        nlp = self._nlp
+        return {
+            "spacy": {
+                "model": self.spacy_model,
+                "loaded": nlp is not None,
+                "pipeline": nlp.pipe_names if nlp is not None else [],
+                "load_seconds": round(self._spacy_load_seconds, 3) if self._spacy_load_seconds else None,
+                "error": self._spacy_error
+            },
+            "mistral": self.mistral.status(),
+            "tokenizer": {
+                "model": MISTRAL_MODEL,
+                "loaded": self._tokenizer is not None,
+                "error": self._tokenizer_error
+            }
+        }
+
+
+# Shared by DocumentProcessor, ModelRouter, ModelStatusChecker and DocumentAnalyzer
+model_registry = ModelRegistry()
@@ -0,0 +1,58 @@
+"""
+Bulk structured-data extraction for compliance sweeps
+Scans every text file in an archive for phone numbers, Aadhaar numbers and
+dates across worker processes and writes one NDJSON record per file
+
+Usage (from backend/):
+    python models/bulk_extract.py /data/archive --output sweep.ndjson
+    python models/bulk_extract.py /data/archive --glob "**/*.md" --processes 8 --chunksize 32
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from regex_patterns import indian_data_extractor, DEFAULT_BULK_CHUNKSIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract phones, Aadhaar numbers and dates from an archive as NDJSON")
+    parser.add_argument("directory", type=Path, help="Archive root")
+    parser.add_argument("--glob", default="**/*.txt", help="Files to scan (default: **/*.txt)")
+    parser.add_argument("--processes", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_BULK_CHUNKSIZE, help="Files per worker dispatch")
+    parser.add_argument("--output", type=Path, help="NDJSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    files = matches = errors = 0
+    try:
+        records = indian_data_extractor.extract_directory(
+            args.directory, args.glob, processes=args.processes, chunksize=args.chunksize
+        )
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            files += 1
+            if "error" in record:
+                errors += 1
+            else:
+                matches += len(record["matches"])
+    finally:
+        if args.output:
+            out.close()
+
+    # Summary on stderr so stdout stays valid NDJSON
+    elapsed = time.perf_counter() - started
+    print(f"✓ {files} files, {matches} matches, {errors} errors in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
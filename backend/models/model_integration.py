@@ -18,7 +18,11 @@ except ImportError as e:
     print("Install with: pip install spacy pytesseract pillow torch transformers")
     sys.exit(1)
 
-from regex_patterns import IndianDataExtractor
+# Shared model registry and extractor live in backend/, imported the way the
+# pipeline does so the process holds one compiled scanner
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_registry import model_registry
+from models.regex_patterns import indian_data_extractor
 
 class DocumentAnalyzer:
     """
@@ -36,13 +40,14 @@ class DocumentAnalyzer:
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
         
-        # Load spaCy model
+        # Shared spaCy pipeline (loaded once per process, NER components only)
         print("Loading spaCy model...")
-        self.nlp = spacy.load('en_core_web_sm')
+        self.nlp = model_registry.get_spacy()
+        if self.nlp is None:
+            raise RuntimeError(f"spaCy model {model_registry.spacy_model} could not be loaded")
         
-        # Load regex extractor
-        print("Loading regex patterns...")
-        self.regex_extractor = IndianDataExtractor()
+        # Shared regex extractor (patterns compiled once per process)
+        self.regex_extractor = indian_data_extractor
         
         # Mistral model (load on demand due to memory)
         self.mistral_model = None
@@ -3,8 +3,140 @@ Regex patterns for extracting Phone Numbers, Aadhaar Numbers, and Dates
 Optimized for Indian data extraction
 """
 
+import os
 import re
-from typing import List, Dict
+import datetime
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+_MONTH = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)'
+
+# (group, kind, pattern) in priority order - the scan is leftmost-first,
+# and at one position the first alternative that matches wins
+PATTERNS = [
+    # Aadhaar with spaces: 1234 5678 9012
+    ("aadhaar_spaced", "aadhaar", r'\b\d{4}\s\d{4}\s\d{4}\b'),
+    # Aadhaar with hyphens: 1234-5678-9012
+    ("aadhaar_hyphen", "aadhaar", r'\b\d{4}-\d{4}-\d{4}\b'),
+    # Aadhaar without separators: 123456789012
+    ("aadhaar_plain", "aadhaar", r'\b\d{12}\b'),
+    # YYYY/MM/DD, YYYY-MM-DD
+    ("date_ymd", "date", r'\b(?P<ymd_y>\d{4})[/\-\.](?P<ymd_m>\d{1,2})[/\-\.](?P<ymd_d>\d{1,2})\b'),
+    # DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY
+    ("date_dmy", "date", r'\b(?P<dmy_d>\d{1,2})[/\-\.](?P<dmy_m>\d{1,2})[/\-\.](?P<dmy_y>\d{2,4})\b'),
+    # DD Month YYYY: 15 January 2024, 15 Jan 2024
+    ("date_day_month", "date", rf'\b(?P<dm_d>\d{{1,2}})\s+(?P<dm_m>{_MONTH})\s+(?P<dm_y>\d{{4}})\b'),
+    # Month DD, YYYY: January 15, 2024
+    ("date_month_day", "date", rf'\b(?P<md_m>{_MONTH})\s+(?P<md_d>\d{{1,2}}),?\s+(?P<md_y>\d{{4}})\b'),
+    # Mobile: +91-9876543210, +919876543210
+    ("mobile_intl", "phone", r'\+?91[-\s]?[6-9]\d{9}'),
+    # Simple 10-digit mobile
+    ("mobile", "phone", r'\b[6-9]\d{9}\b'),
+    # Landline with STD: 011-12345678, (011) 12345678
+    ("landline", "phone", r'\(?\d{2,4}\)?[-\s]?\d{6,8}'),
+]
+
+# Every match starts with a digit, '+', '(' or a month name. Checking this
+# first lets the scan skip most positions without trying each alternative.
+_MATCH_START = r'(?=[\d+(]|\b[JFMASOND])'
+
+# Keys of extract_all() for each match kind
+EXTRACT_KEYS = {"phone": "phone_numbers", "aadhaar": "aadhaar_numbers", "date": "dates"}
+
+# Documents sent to a worker at a time by the bulk entry points
+DEFAULT_BULK_CHUNKSIZE = 16
+
+# Chunks queued per worker process. Pool.imap reads its whole input up
+# front, so input is fed in windows to keep memory bounded.
+BULK_WINDOW_CHUNKS = 4
+
+
+class DataMatch(NamedTuple):
+    """One structured-data match"""
+    kind: str               # 'phone', 'aadhaar' or 'date'
+    text: str               # As written in the document
+    start: int
+    end: int
+    value: Optional[str]    # Normalized: +91XXXXXXXXXX, 12 digits, YYYY-MM-DD (None if not a valid date)
+
+
+def _full_year(year: str) -> int:
+    value = int(year)
+    if len(year) == 2:
+        return 2000 + value if value < 50 else 1900 + value
+    return value
+
+
+def _iso_date(year: str, month, day: str) -> Optional[str]:
+    try:
+        if not isinstance(month, int):
+            month = int(month)
+        if len(year) == 3:
+            return None
+        return datetime.date(_full_year(year), month, int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+class StructuredDataScanner:
+    """
+    Finds phone numbers, Aadhaar numbers and dates in a single pass
+
+    All patterns are compiled once into one alternation, so the text is
+    scanned once instead of once per pattern. Matches don't overlap: a
+    12-digit Aadhaar is not also reported as a phone number.
+    """
+
+    def __init__(self):
+        self.kinds = {group: kind for group, kind, _ in PATTERNS}
+        alternatives = "|".join(f"(?P<{group}>{pattern})" for group, _, pattern in PATTERNS)
+        self.regex = re.compile(f"{_MATCH_START}(?:{alternatives})", re.IGNORECASE)
+
+    def scan(self, text: str) -> List[DataMatch]:
+        """
+        Find every match in text
+
+        Returns:
+            Typed matches in document order
+        """
+        matches = []
+        for match in self.regex.finditer(text):
+            # Outermost group that matched, i.e. the pattern name
+            group = match.lastgroup
+            kind = self.kinds[group]
+            matches.append(DataMatch(kind, match.group(), match.start(), match.end(), self._normalize(group, match)))
+        return matches
+
+    @staticmethod
+    def _normalize(group: str, match: re.Match) -> Optional[str]:
+        text = match.group()
+        if group.startswith("aadhaar"):
+            return re.sub(r'\D', '', text)
+        if group.startswith("mobile"):
+            return "+91" + re.sub(r'\D', '', text)[-10:]
+        if group == "landline":
+            return re.sub(r'\D', '', text)
+        if group == "date_ymd":
+            return _iso_date(match.group("ymd_y"), match.group("ymd_m"), match.group("ymd_d"))
+        if group == "date_dmy":
+            return _iso_date(match.group("dmy_y"), match.group("dmy_m"), match.group("dmy_d"))
+        if group == "date_day_month":
+            return _iso_date(match.group("dm_y"), MONTHS[match.group("dm_m")[:3].lower()], match.group("dm_d"))
+        if group == "date_month_day":
+            return _iso_date(match.group("md_y"), MONTHS[match.group("md_m")[:3].lower()], match.group("md_d"))
+        return None
+
+
+# Compiled once, shared by every extractor and request
+scanner = StructuredDataScanner()
+
 
 class IndianDataExtractor:
     """
@@ -14,95 +146,146 @@ class IndianDataExtractor:
     - Dates (multiple formats)
     """
     
-    def __init__(self):
-        # Phone number patterns (Indian)
-        self.phone_patterns = [
-            # Mobile: +91-9876543210, +919876543210, 9876543210
-            r'\+?91[-\s]?[6-9]\d{9}',
-            # Landline with STD: 011-12345678, (011) 12345678
-            r'\(?\d{2,4}\)?[-\s]?\d{6,8}',
-            # Simple 10-digit mobile
-            r'\b[6-9]\d{9}\b'
-        ]
-        
-        # Aadhaar number patterns (12 digits)
-        self.aadhaar_patterns = [
-            # Aadhaar with spaces: 1234 5678 9012
-            r'\b\d{4}\s\d{4}\s\d{4}\b',
-            # Aadhaar with hyphens: 1234-5678-9012
-            r'\b\d{4}-\d{4}-\d{4}\b',
-            # Aadhaar without separators: 123456789012
-            r'\b\d{12}\b'
-        ]
-        
-        # Date patterns (multiple formats)
-        self.date_patterns = [
-            # DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY
-            r'\b\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}\b',
-            # YYYY/MM/DD, YYYY-MM-DD
-            r'\b\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}\b',
-            # DD Month YYYY: 15 January 2024, 15 Jan 2024
-            r'\b\d{1,2}\s+(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4}\b',
-            # Month DD, YYYY: January 15, 2024
-            r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2},?\s+\d{4}\b'
-        ]
+    def __init__(self, scanner: StructuredDataScanner = scanner):
+        self.scanner = scanner
+    
+    def scan(self, text: str) -> List[DataMatch]:
+        """Typed matches with offsets and normalized values"""
+        return self.scanner.scan(text)
+    
+    def _unique(self, text: str, kind: str) -> List[str]:
+        return list(dict.fromkeys(m.text for m in self.scanner.scan(text) if m.kind == kind))
     
     def extract_phone_numbers(self, text: str) -> List[str]:
         """Extract all phone numbers from text"""
-        phone_numbers = []
-        for pattern in self.phone_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            phone_numbers.extend(matches)
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(phone_numbers))
+        return self._unique(text, "phone")
     
     def extract_aadhaar_numbers(self, text: str) -> List[str]:
         """Extract all Aadhaar numbers from text"""
-        aadhaar_numbers = []
-        for pattern in self.aadhaar_patterns:
-            matches = re.findall(pattern, text)
-            aadhaar_numbers.extend(matches)
-        
-        # Remove duplicates and validate
-        unique_aadhaars = list(dict.fromkeys(aadhaar_numbers))
-        
-        # Validate Aadhaar (should be exactly 12 digits when cleaned)
-        validated = []
-        for aadhaar in unique_aadhaars:
-            cleaned = re.sub(r'[\s-]', '', aadhaar)
-            if len(cleaned) == 12 and cleaned.isdigit():
-                validated.append(aadhaar)
-        
-        return validated
+        return self._unique(text, "aadhaar")
     
     def extract_dates(self, text: str) -> List[str]:
         """Extract all dates from text"""
-        dates = []
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(dates))
+        return self._unique(text, "date")
     
     def extract_all(self, text: str) -> Dict[str, List[str]]:
-        """Extract all patterns from text"""
-        return {
-            'phone_numbers': self.extract_phone_numbers(text),
-            'aadhaar_numbers': self.extract_aadhaar_numbers(text),
-            'dates': self.extract_dates(text)
-        }
+        """Extract all patterns from text (unique matches as written, in document order)"""
+        data = {key: {} for key in EXTRACT_KEYS.values()}
+        for match in self.scanner.scan(text):
+            data[EXTRACT_KEYS[match.kind]][match.text] = None
+        return {key: list(values) for key, values in data.items()}
     
     def mask_aadhaar(self, text: str, mask_char: str = 'X') -> str:
         """Mask Aadhaar numbers in text for privacy (show only last 4 digits)"""
-        for pattern in self.aadhaar_patterns:
-            text = re.sub(
-                pattern,
-                lambda m: mask_char * 8 + m.group()[-4:],
-                text
-            )
-        return text
+        parts = []
+        pos = 0
+        for match in self.scanner.scan(text):
+            if match.kind == "aadhaar":
+                parts.append(text[pos:match.start])
+                parts.append(mask_char * 8 + match.text[-4:])
+                pos = match.end
+        parts.append(text[pos:])
+        return "".join(parts)
+    
+    def extract_many(
+        self,
+        texts: Iterable[Union[str, Tuple[str, str]]],
+        processes: Optional[int] = None,
+        chunksize: int = DEFAULT_BULK_CHUNKSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Scan many texts in parallel across worker processes
+        
+        Args:
+            texts: Texts, or (doc_id, text) pairs (ids default to the position)
+            processes: Worker processes (default: CPU count, 1 runs inline)
+            chunksize: Documents sent to a worker at a time
+        
+        Yields:
+            One record per text, in input order: {"id", "chars", "counts",
+            "matches"}, or {"id", "error"} if the text could not be scanned
+        """
+        items = (
+            text if isinstance(text, tuple) else (str(i), text)
+            for i, text in enumerate(texts)
+        )
+        return self._bulk(items, processes, chunksize)
+    
+    def extract_directory(
+        self,
+        directory: Union[str, Path],
+        pattern: str = "**/*.txt",
+        processes: Optional[int] = None,
+        chunksize: int = DEFAULT_BULK_CHUNKSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Scan every matching file under a directory in parallel
+        
+        Workers read the files themselves, only paths cross process
+        boundaries. Record ids are paths relative to the directory.
+        
+        Args:
+            directory: Archive root
+            pattern: Glob for the files to scan
+            processes: Worker processes (default: CPU count, 1 runs inline)
+            chunksize: Files sent to a worker at a time
+        """
+        root = Path(directory)
+        items = (
+            (path.relative_to(root).as_posix(), path)
+            for path in sorted(root.glob(pattern))
+            if path.is_file()
+        )
+        return self._bulk(items, processes, chunksize)
+    
+    def _bulk(self, items: Iterator[Tuple[str, Any]], processes: Optional[int], chunksize: int) -> Iterator[Dict[str, Any]]:
+        processes = processes or os.cpu_count() or 1
+        if processes == 1:
+            yield from map(_scan_record, items)
+            return
+        
+        window = processes * chunksize * BULK_WINDOW_CHUNKS
+        with Pool(processes) as pool:
+            # Queue the next window before draining the current one so
+            # workers never wait between windows
+            pending = None
+            while True:
+                batch = list(islice(items, window))
+                current = pool.imap(_scan_record, batch, chunksize=chunksize) if batch else None
+                if pending is not None:
+                    yield from pending
+                if current is None:
+                    break
+                pending = current
+
+
+# Shared extractor for the pipeline
+indian_data_extractor = IndianDataExtractor()
+
+
+def _scan_record(item: Tuple[str, Union[str, Path]]) -> Dict[str, Any]:
+    """
+    Bulk worker: scan one document into an NDJSON-ready record
+
+    Args:
+        item: (doc_id, text), or (doc_id, path) for a file the worker reads
+    """
+    doc_id, source = item
+    try:
+        text = source.read_text(encoding="utf-8", errors="replace") if isinstance(source, Path) else source
+        matches = scanner.scan(text)
+    except Exception as e:
+        return {"id": doc_id, "error": str(e)}
+
+    counts = dict.fromkeys(EXTRACT_KEYS, 0)
+    for match in matches:
+        counts[match.kind] += 1
+    return {
+        "id": doc_id,
+        "chars": len(text),
+        "counts": counts,
+        "matches": [match._asdict() for match in matches]
+    }
 
 
 # Example usage and testing
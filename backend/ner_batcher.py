@@ -0,0 +1,305 @@
+"""
+NER Micro-batcher
+Collects entity-extraction requests from concurrent tasks and runs them
+through the shared spaCy pipeline in batches with nlp.pipe
+"""
+
+import os
+import re
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from model_registry import model_registry, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# (text, label, start_char, end_char)
+Entity = Tuple[str, str, int, int]
+
+# Texts per nlp.pipe batch
+DEFAULT_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "64"))
+
+# How long the worker waits for more requests before running a batch
+DEFAULT_MAX_WAIT_MS = float(os.getenv("NER_MAX_WAIT_MS", "10"))
+
+# Worker processes for nlp.pipe. spaCy starts them on every pipe() call,
+# so values above 1 only pay off for large batches on multi-core hosts.
+DEFAULT_N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))
+
+# Longest piece of a document handed to spaCy at once. Far below
+# nlp.max_length so a large document becomes chunks that share batches.
+DEFAULT_CHUNK_CHARS = int(os.getenv("NER_CHUNK_CHARS", "100000"))
+
+# Context a chunk reads past each end of the range it owns, so an entity
+# at a cut is seen whole by the chunk that owns its start
+CHUNK_OVERLAP_CHARS = 200
+
+# How far back from a cut to look for a sentence end
+SENTENCE_SEARCH_CHARS = 2000
+
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+
+# spaCy labels kept in the entity index, and the group each is listed under
+ENTITY_GROUPS = {
+    "PERSON": "persons",
+    "GPE": "locations",
+    "LOC": "locations",
+    "ORG": "organizations",
+    "DATE": "dates",
+    "MONEY": "money"
+}
+
+# Occurrence offsets stored per entity, the count keeps going past this
+MAX_ENTITY_OFFSETS = 50
+
+
+def _cut_point(text: str, pos: int, lo: int) -> int:
+    """Last sentence start in text[lo:pos], else last word start, else pos"""
+    if pos >= len(text):
+        return len(text)
+    search_from = max(lo, pos - SENTENCE_SEARCH_CHARS)
+    cut = None
+    for match in _SENTENCE_END.finditer(text, search_from, pos):
+        cut = match.end()
+    if cut is not None and cut > lo:
+        return cut
+    space = text.rfind(' ', search_from, pos)
+    if space >= lo:
+        return space + 1
+    return pos
+
+
+def split_for_ner(text: str, chunk_chars: int, overlap: int = CHUNK_OVERLAP_CHARS) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Split text into chunks cut at sentence (or word) boundaries
+
+    Every character is owned by exactly one chunk. A chunk also reads
+    context past each end of its own range: back to a sentence or word
+    start about `overlap` characters before it, and forward to the last
+    word end within `overlap` characters after it. No chunk is longer than
+    chunk_chars + 2 * overlap + SENTENCE_SEARCH_CHARS, however long the
+    text or its runs without spaces.
+
+    Yields:
+        (start, end, own_start, own_end) per chunk
+    """
+    length = len(text)
+    own_start = 0
+    while own_start < length:
+        own_end = _cut_point(text, own_start + chunk_chars, own_start + 1)
+        start = _cut_point(text, max(own_start - overlap, 0), 0)
+        limit = own_end + overlap
+        if limit >= length:
+            end = length
+        else:
+            space = text.rfind(' ', own_end, limit)
+            end = space if space > own_end else limit
+        yield start, end, own_start, own_end
+        own_start = own_end
+
+
+def entity_index(entities: Iterable[Entity]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Collapse entity mentions into one entry per unique (text, label)
+
+    Args:
+        entities: Mentions in document order
+
+    Returns:
+        {group: [{"text", "label", "count", "offsets"}]} with groups from
+        ENTITY_GROUPS, entries sorted by count. offsets are start offsets
+        (the end is start + len(text)), at most MAX_ENTITY_OFFSETS per entry.
+    """
+    index = {group: {} for group in ENTITY_GROUPS.values()}
+    for text, label, start, _ in entities:
+        group = ENTITY_GROUPS.get(label)
+        if group is None:
+            continue
+        entry = index[group].get((text, label))
+        if entry is None:
+            entry = index[group][(text, label)] = {"text": text, "label": label, "count": 0, "offsets": []}
+        entry["count"] += 1
+        if len(entry["offsets"]) < MAX_ENTITY_OFFSETS:
+            entry["offsets"].append(start)
+
+    return {
+        group: sorted(entries.values(), key=lambda entry: -entry["count"])
+        for group, entries in index.items()
+    }
+
+
+class NERBatcher:
+    """
+    Runs NER for many callers through one worker thread
+
+    Callers block on extract() while the worker gathers every request that
+    arrives within max_wait_ms (up to batch_size texts) and runs them as a
+    single nlp.pipe call. Results are handed back per text through futures.
+    The worker is the only thread touching the spaCy pipeline.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry = model_registry,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        n_process: int = DEFAULT_N_PROCESS,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS
+    ):
+        """
+        Args:
+            registry: Registry providing the spaCy pipeline
+            batch_size: Maximum texts per batch (also nlp.pipe batch_size)
+            max_wait_ms: Time to wait for more requests once one arrived
+            n_process: Processes nlp.pipe uses
+            chunk_chars: Chunk size for documents split by extract_document()
+        """
+        self.registry = registry
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.n_process = n_process
+        self.chunk_chars = chunk_chars
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+        # Counters for status reporting
+        self.batches = 0
+        self.texts = 0
+        self.busy_seconds = 0.0
+
+    def available(self) -> bool:
+        return self.registry.get_spacy() is not None
+
+    def extract(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[List[Entity]]:
+        """
+        Extract entities from texts, batched with other callers' texts
+
+        Args:
+            texts: Texts to analyze
+            timeout: Seconds to wait for the results
+
+        Returns:
+            Entities per text, in order
+
+        Raises:
+            RuntimeError: If the spaCy model is not available
+        """
+        return [future.result(timeout) for future in self._submit(texts)]
+
+    def extract_document(self, text: str, timeout: Optional[float] = None) -> Iterator[Entity]:
+        """
+        Extract entities from a document of any length
+
+        Long text is split at sentence boundaries into chunks that run in
+        parallel through the batcher, at most batch_size chunks at a time so
+        memory stays bounded. Offsets refer to the whole text, and an entity
+        seen by two overlapping chunks is reported once.
+
+        Args:
+            text: Document text
+            timeout: Seconds to wait for each wave of chunks
+
+        Yields:
+            Entities in document order
+        """
+        nlp = self.registry.get_spacy()
+        if nlp is None:
+            raise RuntimeError(f"spaCy model {self.registry.spacy_model} is not available")
+
+        # Chunks plus their overlap must stay under spaCy's limit
+        chunk_chars = min(self.chunk_chars, nlp.max_length // 2)
+        chunks = split_for_ner(text, chunk_chars)
+        while True:
+            wave = [chunk for _, chunk in zip(range(self.batch_size), chunks)]
+            if not wave:
+                break
+            futures = self._submit([text[start:end] for start, end, _, _ in wave])
+            for (start, _, own_start, own_end), future in zip(wave, futures):
+                for ent_text, label, ent_start, ent_end in future.result(timeout):
+                    # The chunk owning the start reports the entity
+                    if own_start <= start + ent_start < own_end:
+                        yield ent_text, label, start + ent_start, start + ent_end
+
+    def _submit(self, texts: Sequence[str]) -> List[Future]:
+        if not self.available():
+            raise RuntimeError(f"spaCy model {self.registry.spacy_model} is not available")
+
+        self._ensure_worker()
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future))
+            futures.append(future)
+        return futures
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="ner-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        """Block for one request, then gather more until the batch is full or max_wait passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        nlp = self.registry.get_spacy()
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                docs = nlp.pipe(
+                    (text for text, _ in batch),
+                    batch_size=self.batch_size,
+                    n_process=self.n_process
+                )
+                # docs first, so the generator runs to the end and spaCy
+                # shuts down its worker processes
+                for doc, (_, future) in zip(docs, batch):
+                    future.set_result([
+                        (ent.text, ent.label_, ent.start_char, ent.end_char)
+                        for ent in doc.ents
+                    ])
+            except Exception as e:
+                logger.error(f"✗ NER batch of {len(batch)} failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            elapsed = time.perf_counter() - started
+            self.batches += 1
+            self.texts += len(batch)
+            self.busy_seconds += elapsed
+            logger.debug(f"NER batch: {len(batch)} texts in {elapsed * 1000:.0f}ms")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "n_process": self.n_process,
+            "chunk_chars": self.chunk_chars,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch": round(self.texts / self.batches, 2) if self.batches else None,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "queued": self._queue.qsize()
+        }
+
+
+# Shared by every DocumentProcessor in the process
+ner_batcher = NERBatcher()
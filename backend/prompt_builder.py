@@ -0,0 +1,149 @@
+"""
+Token-Budget Prompt Builder
+Fits the cleaned report into exactly the prompt tokens a backend has left
+after its instructions and reply, keeping the most relevant sections when
+the whole report doesn't fit
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, Any, List, NamedTuple
+
+import numpy as np
+
+from extractive_summary import split_sentences, rank_sentences
+from map_reduce_summary import estimate_tokens, CHARS_PER_TOKEN
+from model_registry import model_registry, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Context window LM Studio loads the model with (its default is 4096)
+LM_STUDIO_CONTEXT_TOKENS = int(os.getenv("LM_STUDIO_CONTEXT_TOKENS", "4096"))
+
+# Head-room for chat-template markup, special tokens and tokens that merge
+# differently where packed sections meet
+PROMPT_SAFETY_TOKENS = 16
+
+# Separator between packed sections, counted as one token each
+SECTION_SEPARATOR = "\n"
+
+
+class BuiltPrompt(NamedTuple):
+    prompt: str
+    prompt_tokens: int      # instructions + report text
+    text_tokens: int        # report text as packed
+    budget_tokens: int      # prompt tokens the backend allows
+    packed: bool            # the report was over budget and cut down
+    sections_used: int
+    sections_total: int
+    exact: bool             # counted with the tokenizer, not estimated
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "text_tokens": self.text_tokens,
+            "budget_tokens": self.budget_tokens,
+            "packed": self.packed,
+            "sections_used": self.sections_used,
+            "sections_total": self.sections_total,
+            "exact": self.exact
+        }
+
+
+class PromptBuilder:
+    """
+    Builds prompts that fit a token budget
+
+    Text is tokenized once whole and, only if it is over budget, once more
+    as a single batch of sections (or, with no sentences to rank, cut at
+    the budget). Sections are ranked with the
+    extractive summarizer's TextRank scores and packed greedily, best first,
+    skipping any that no longer fit; the chosen ones keep document order.
+    Instruction overhead is counted once per template.
+    """
+
+    def __init__(self, registry: ModelRegistry = model_registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._overhead: Dict[str, int] = {}
+
+    def count(self, texts: List[str]) -> List[int]:
+        """Tokens per text, in one tokenizer call (estimated if there is no tokenizer)"""
+        tokenizer = self.registry.get_tokenizer()
+        if tokenizer is None:
+            return [estimate_tokens(text) for text in texts]
+        return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def _template_overhead(self, template: str) -> int:
+        overhead = self._overhead.get(template)
+        if overhead is None:
+            overhead = self.count([template.format(text="")])[0]
+            with self._lock:
+                self._overhead[template] = overhead
+        return overhead
+
+    def build(self, template: str, text: str, budget_tokens: int) -> BuiltPrompt:
+        """
+        Format template with as much of text as fits budget_tokens
+
+        Args:
+            template: Prompt with a {text} placeholder
+            text: Cleaned (or map-reduced) report text
+            budget_tokens: Prompt tokens allowed, reply excluded
+
+        Returns:
+            BuiltPrompt with the prompt and its token counts
+        """
+        exact = self.registry.get_tokenizer() is not None
+        overhead = self._template_overhead(template)
+        available = max(budget_tokens - overhead - PROMPT_SAFETY_TOKENS, 0)
+
+        text_tokens = self.count([text])[0]
+        if text_tokens <= available:
+            return BuiltPrompt(template.format(text=text), overhead + text_tokens, text_tokens, budget_tokens, False, 0, 0, exact)
+
+        sections = split_sentences(text)
+        packed, used_tokens = self._pack(sections, available)
+        if not packed:
+            # No rankable sentences (one long unpunctuated run), keep the start
+            head, used_tokens = self._head(text, available)
+            packed = [head] if head else []
+        logger.info(
+            f"✂ Report is {text_tokens} tokens, {available} fit: "
+            f"packed {len(packed)}/{len(sections)} sections ({used_tokens} tokens)"
+        )
+        packed_text = SECTION_SEPARATOR.join(packed)
+        return BuiltPrompt(
+            template.format(text=packed_text), overhead + used_tokens, used_tokens,
+            budget_tokens, True, len(packed), len(sections), exact
+        )
+
+    def _head(self, text: str, available: int):
+        tokenizer = self.registry.get_tokenizer()
+        if tokenizer is None:
+            head = text[:available * CHARS_PER_TOKEN]
+            return head, estimate_tokens(head)
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"][:available]
+        return tokenizer.decode(ids), len(ids)
+
+    def _pack(self, sections, available: int):
+        if not sections:
+            return [], 0
+        scores, _ = rank_sentences(sections)
+        # Separators cost a token each
+        costs = [tokens + 1 for tokens in self.count([section for section, _, _ in sections])]
+
+        chosen = []
+        used = 0
+        for index in np.argsort(-scores, kind="stable"):
+            if scores[index] <= 0:
+                break
+            if used + costs[index] <= available:
+                chosen.append(index)
+                used += costs[index]
+        return [sections[index][0] for index in sorted(chosen)], used
+
+
+# Shared by every summarizer backend
+prompt_builder = PromptBuilder()
@@ -0,0 +1,755 @@
+"""
+Redaction Engine for the text cleaning node
+Declarative rule files compiled at startup, literal-prefix driven matching
+Matches are collected as a span map over the original text and applied once
+Anchor keyword prefilter skips rules that cannot match a document
+Rule files are hot-reloaded when they change on disk
+Per-rule time budgets guard workers against runaway patterns
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Set, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the *.yaml rule files (override with REDACTION_RULES_DIR)
+DEFAULT_RULES_DIR = Path(__file__).parent / "redaction_rules"
+
+# Time a single rule may spend on one scanned text - a document, or one
+# window of a streamed document (0 disables the guard)
+DEFAULT_RULE_BUDGET_MS = 250
+
+# What a rule does once it runs over budget:
+#   "line" - finish the scan with every match attempt cut at the end of its
+#            line (and MAX_BOUNDED_MATCH chars); skip the rest if that also
+#            runs over budget
+#   "skip" - stop running the rule on this text
+FALLBACK_MODES = ("line", "skip")
+
+# Longest match a bounded (fallback) attempt may produce
+MAX_BOUNDED_MATCH = 2000
+
+
+class RuleBudgetExceeded(Exception):
+    """Raised by RedactionRule.finditer when a scan passes its deadline"""
+
+    def __init__(self, position: int):
+        super().__init__(position)
+        self.position = position
+
+
+class RedactionRule:
+    """A single compiled redaction rule"""
+
+    def __init__(
+        self,
+        label: str,
+        pattern: str,
+        replacement: str,
+        category: str,
+        priority: int = 0,
+        prefixes: Sequence[str] = (),
+        anchors: Sequence[str] = (),
+        ignorecase: bool = False,
+        budget_ms: Optional[float] = None
+    ):
+        self.label = label
+        self.pattern = pattern
+        self.replacement = replacement
+        self.category = category
+        self.priority = priority
+        self.regex = re.compile(pattern, re.IGNORECASE if ignorecase else 0)
+        self.ignorecase = bool(self.regex.flags & re.IGNORECASE)
+        self.prefixes = tuple(p.lower() for p in prefixes) if self.ignorecase else tuple(prefixes)
+        self.anchors = frozenset(a.lower() for a in anchors)
+        self.budget_ms = budget_ms
+
+    def finditer(
+        self,
+        text: str,
+        haystack: Optional[str],
+        pos: int = 0,
+        deadline: Optional[float] = None,
+        bounded: bool = False
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (start, end) of every non-empty match from pos, left to right
+
+        haystack is the text to search for prefixes in: the text itself for
+        case-sensitive rules, its lowercase form for case-insensitive ones,
+        or None to fall back to a plain regex scan.
+
+        Args:
+            deadline: time.perf_counter() value after which the scan raises
+                RuleBudgetExceeded. Checked between match attempts; a single
+                attempt cannot be interrupted.
+            bounded: Cut every match attempt at the end of its line and at
+                MAX_BOUNDED_MATCH chars, so each attempt is cheap
+        """
+        if not self.prefixes or haystack is None:
+            yield from self._scan(text, pos, deadline, bounded)
+            return
+
+        # Next occurrence of every prefix; a match can only start at one of them
+        positions = [haystack.find(p, pos) for p in self.prefixes]
+        while True:
+            candidates = [p for p in positions if p >= 0]
+            if not candidates:
+                return
+            start = min(candidates)
+
+            if deadline is not None and time.perf_counter() > deadline:
+                raise RuleBudgetExceeded(start)
+
+            if bounded:
+                match = self.regex.match(text, start, _bounded_end(text, start))
+            else:
+                match = self.regex.match(text, start)
+            if match and match.end() > start:
+                yield start, match.end()
+                resume = match.end()
+            else:
+                resume = start + 1
+
+            # Advance every prefix that now lies behind the scan position
+            for i, p in enumerate(positions):
+                if 0 <= p < resume:
+                    positions[i] = haystack.find(self.prefixes[i], resume)
+
+    def _scan(
+        self,
+        text: str,
+        pos: int,
+        deadline: Optional[float],
+        bounded: bool
+    ) -> Iterator[Tuple[int, int]]:
+        """Plain regex scan for rules without prefixes"""
+        if not bounded:
+            for match in self.regex.finditer(text, pos):
+                if match.end() > match.start():
+                    yield match.start(), match.end()
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise RuleBudgetExceeded(max(match.end(), match.start() + 1))
+            return
+
+        # One bounded search per line (or MAX_BOUNDED_MATCH slice of a long line)
+        while pos < len(text):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise RuleBudgetExceeded(pos)
+
+            endpos = _bounded_end(text, pos)
+            match = self.regex.search(text, pos, endpos)
+            if match and match.end() > match.start():
+                yield match.start(), match.end()
+                pos = match.end()
+            elif match:
+                pos = match.start() + 1
+            else:
+                pos = endpos
+
+
+def _bounded_end(text: str, start: int) -> int:
+    """End of the window a bounded match attempt at start may use"""
+    limit = min(len(text), start + MAX_BOUNDED_MATCH)
+    # A match may begin with the newline that ends the previous line
+    newline = text.find('\n', start + 1, limit)
+    return limit if newline < 0 else newline
+
+
+class AnchorScanner:
+    """
+    Finds which anchor keywords occur in a text
+
+    Every distinct keyword across all rules is checked once, so adding rules
+    that share keywords adds no scanning cost. ASCII text is searched through
+    a single lowercase copy with C-level substring search, which measured far
+    faster than one big regex alternation. Other text uses case-insensitive
+    regex searches so results always agree with re.IGNORECASE.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = sorted(set(keywords))
+        self._regexes = {k: re.compile(re.escape(k), re.IGNORECASE) for k in self.keywords}
+
+    def scan(self, text: str, lowered: Optional[str] = None) -> Set[str]:
+        """
+        Return the set of keywords present in text
+
+        lowered may pass in an already computed text.lower() for ASCII text.
+        """
+        if text.isascii():
+            lowered = lowered if lowered is not None else text.lower()
+            return {
+                k for k in self.keywords
+                if (k in lowered if k.isascii() else self._regexes[k].search(text))
+            }
+        return {k for k in self.keywords if self._regexes[k].search(text)}
+
+
+# A letter or digit - split pieces without one carry no PII
+_WORD_CHAR = re.compile(r'[^\W_]')
+
+
+def _free_pieces(claimed: bytearray, start: int, end: int) -> List[Tuple[int, int]]:
+    """Runs of start:end not yet claimed"""
+    pieces = []
+    pos = start
+    while pos < end:
+        free = claimed.find(0, pos, end)
+        if free < 0:
+            break
+        taken = claimed.find(1, free, end)
+        pos = end if taken < 0 else taken
+        pieces.append((free, pos))
+    return pieces
+
+
+# Stands in for earlier redactions when a match is retried on the text as the
+# old substitution cascade saw it
+_MARKER = '[REDACTED]'
+
+# Text before a retried match kept for lookbehinds and word boundaries, and
+# how far past the original match the retry may run on
+_RETRY_CONTEXT = 64
+_RETRY_REACH = 512
+
+
+def _cascade_end(rule: RedactionRule, text: str, claimed: bytearray, start: int, end: int) -> int:
+    """
+    End of rule's match at start with every claimed run shown as a marker
+
+    The old cascade matched each rule against text already carrying the
+    markers of earlier rules, so a greedy pattern could run on over a
+    marker that had replaced a newline or a colon. Returns start when the
+    rule does not match there.
+    """
+    low = max(0, start - _RETRY_CONTEXT)
+    high = min(len(text), end + _RETRY_REACH)
+
+    # (view offset, text start, text end, is marker) per piece of the view
+    segments = []
+    parts = []
+    length = 0
+    pos = low
+    while pos < high:
+        taken = claimed.find(1, pos, high)
+        taken = high if taken < 0 else taken
+        if taken > pos:
+            segments.append((length, pos, taken, False))
+            parts.append(text[pos:taken])
+            length += taken - pos
+        if taken == high:
+            break
+        free = claimed.find(0, taken, high)
+        pos = high if free < 0 else free
+        segments.append((length, taken, pos, True))
+        parts.append(_MARKER)
+        length += len(_MARKER)
+
+    view = ''.join(parts)
+    origin = next(v + start - a for v, a, b, marker in segments if not marker and a <= start < b)
+    match = rule.regex.match(view, origin)
+    if not match or match.end() == origin:
+        return start
+
+    for v, a, b, marker in reversed(segments):
+        if v < match.end():
+            return b if marker else a + match.end() - v
+    return start
+
+
+def _overlapped_pieces(rule: RedactionRule, text: str, claimed: bytearray, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Pieces to redact of a match that touches earlier spans
+
+    A match starting inside an earlier span keeps its free tail, if that is
+    contiguous. Otherwise the match is retried the way the cascade saw the
+    text (see _cascade_end) and the free text it covers is redacted, so
+    PII the cascade removed is never left behind. When earlier spans split
+    it, pieces without a letter or digit (the spaces and colons between
+    redactions) are left alone.
+    """
+    pieces = _free_pieces(claimed, start, end)
+    edge = len(pieces) == 1 and (pieces[0][0] == start or pieces[0][1] == end)
+    if claimed[start]:
+        return pieces if edge else []
+
+    stop = _cascade_end(rule, text, claimed, start, end)
+    if stop == start:
+        return pieces if edge else []
+
+    pieces = _free_pieces(claimed, start, stop)
+    if len(pieces) > 1:
+        pieces = [(a, b) for a, b in pieces if _WORD_CHAR.search(text, a, b)]
+    return pieces
+
+
+def _settled(spans: List[Tuple[int, int, RedactionRule, int]], before: int) -> List[Tuple[int, int, RedactionRule, int]]:
+    """Spans settling text[:before]: see RedactionEngine.match_spans"""
+    pieces = {}
+    for span in spans:
+        pieces.setdefault(span[3], []).append(span)
+
+    selected = set()
+    end = before
+    for start, _, _, number in spans:
+        if start >= end:
+            break
+        if number not in selected:
+            selected.add(number)
+            end = max([end] + [piece[1] for piece in pieces[number]])
+    return [span for span in spans if span[3] in selected]
+
+
+class RuleSet:
+    """Immutable, compiled set of rules merged from one or more rule files"""
+
+    def __init__(self, rules: List[RedactionRule], version: str, sources: Dict[str, Any]):
+        # Stable sort keeps file order for rules with equal priority
+        self.rules = sorted(rules, key=lambda rule: rule.priority)
+        self.version = version
+        self.sources = sources
+        self.anchor_scanner = AnchorScanner([a for rule in self.rules for a in rule.anchors])
+
+
+def _compile_rule(entry: Dict[str, Any], source: str) -> RedactionRule:
+    """Validate one rule entry from a rule file and compile it"""
+    label = entry.get('label')
+    if not label:
+        raise ValueError(f"{source}: rule without a label")
+
+    for field in ('pattern', 'category'):
+        if not isinstance(entry.get(field), str) or not entry[field]:
+            raise ValueError(f"{source}: rule '{label}' is missing '{field}'")
+
+    budget_ms = entry.get('budget_ms')
+    if budget_ms is not None and (not isinstance(budget_ms, (int, float)) or budget_ms < 0):
+        raise ValueError(f"{source}: rule '{label}' budget_ms must be a non-negative number")
+
+    prefixes = entry.get('prefixes') or []
+    anchors = entry.get('anchors') or []
+    if not isinstance(prefixes, list) or not isinstance(anchors, list):
+        raise ValueError(f"{source}: rule '{label}' prefixes and anchors must be lists")
+
+    try:
+        return RedactionRule(
+            label=label,
+            pattern=entry['pattern'],
+            replacement=str(entry.get('replacement', '')),
+            category=entry['category'],
+            priority=int(entry.get('priority', 0)),
+            prefixes=[str(p) for p in prefixes],
+            anchors=[str(a) for a in anchors],
+            ignorecase=bool(entry.get('ignorecase', False)),
+            budget_ms=budget_ms
+        )
+    except re.error as e:
+        raise ValueError(f"{source}: rule '{label}' has an invalid pattern: {e}")
+
+
+def load_rule_files(paths: Sequence[Path]) -> RuleSet:
+    """
+    Load and compile rule files into a single rule set
+
+    Args:
+        paths: YAML rule files, merged in the given order
+
+    Returns:
+        Compiled RuleSet
+
+    Raises:
+        ValueError: If a file or rule is malformed
+    """
+    rules = []
+    labels = set()
+    sources = {}
+    digest = hashlib.sha256()
+
+    for path in paths:
+        raw = Path(path).read_bytes()
+        digest.update(raw)
+
+        data = yaml.safe_load(raw) or {}
+        if not isinstance(data, dict) or not isinstance(data.get('rules', []), list):
+            raise ValueError(f"{path.name}: expected a mapping with a 'rules' list")
+
+        sources[path.name] = data.get('version', 0)
+        for entry in data.get('rules', []):
+            if not isinstance(entry, dict):
+                raise ValueError(f"{path.name}: every rule must be a mapping")
+            if entry.get('enabled', True) is False:
+                continue
+
+            rule = _compile_rule(entry, path.name)
+            if rule.label in labels:
+                raise ValueError(f"{path.name}: duplicate rule label '{rule.label}'")
+            labels.add(rule.label)
+            rules.append(rule)
+
+    # e.g. "default@1+site@1#3f2a9c1b" - file versions plus a content hash
+    version = "+".join(f"{Path(name).stem}@{v}" for name, v in sources.items())
+    version = f"{version}#{digest.hexdigest()[:8]}"
+
+    return RuleSet(rules, version, sources)
+
+
+def span_map(spans: Sequence[Tuple[int, int, RedactionRule]], offset: int = 0) -> List[Dict[str, Any]]:
+    """Serializable form of match_spans() output, offsets shifted by offset"""
+    return [
+        {"offset": offset + start, "length": end - start, "category": rule.category, "rule": rule.label}
+        for start, end, rule in spans
+    ]
+
+
+class RuleStats:
+    """Per-rule time and match counters, aggregated over all scanned texts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.scans = 0
+        self._rules = {}
+
+    def record(self, samples: List[Tuple[str, float, int, str]]):
+        """
+        Add the measurements of one scanned text
+
+        Args:
+            samples: (label, seconds, matches, outcome) for every rule that
+                ran, where outcome is "ok", "bounded" or "skipped"
+        """
+        with self._lock:
+            self.scans += 1
+            for label, seconds, matches, outcome in samples:
+                entry = self._rules.get(label)
+                if entry is None:
+                    entry = self._rules[label] = {
+                        "runs": 0, "matches": 0, "total_s": 0.0, "max_s": 0.0,
+                        "bounded": 0, "skipped": 0
+                    }
+                entry["runs"] += 1
+                entry["matches"] += matches
+                entry["total_s"] += seconds
+                entry["max_s"] = max(entry["max_s"], seconds)
+                if outcome != "ok":
+                    entry[outcome] += 1
+
+    def report(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rules sorted by total time spent, slowest first"""
+        with self._lock:
+            items = [(label, dict(entry)) for label, entry in self._rules.items()]
+
+        items.sort(key=lambda item: item[1]["total_s"], reverse=True)
+        return [
+            {
+                "label": label,
+                "runs": entry["runs"],
+                "matches": entry["matches"],
+                "total_ms": round(entry["total_s"] * 1000, 3),
+                "mean_ms": round(entry["total_s"] * 1000 / entry["runs"], 3),
+                "max_ms": round(entry["max_s"] * 1000, 3),
+                "over_budget_bounded": entry["bounded"],
+                "over_budget_skipped": entry["skipped"]
+            }
+            for label, entry in items[:top]
+        ]
+
+    def reset(self):
+        with self._lock:
+            self.scans = 0
+            self._rules = {}
+
+
+class RedactionEngine:
+    """Applies a compiled rule set to text, reloading it when rule files change"""
+
+    def __init__(
+        self,
+        rules_dir: Optional[Path] = None,
+        check_interval: float = 2.0,
+        budget_ms: Optional[float] = None,
+        fallback: Optional[str] = None
+    ):
+        """
+        Args:
+            rules_dir: Directory of *.yaml rule files
+            check_interval: Minimum seconds between checks for changed rule files
+            budget_ms: Default time budget per rule and scanned text (0 = unlimited),
+                rules can override it with budget_ms in their rule file
+            fallback: What an over-budget rule does, one of FALLBACK_MODES
+        """
+        self.rules_dir = Path(rules_dir or os.getenv('REDACTION_RULES_DIR') or DEFAULT_RULES_DIR)
+        self.check_interval = check_interval
+        self.budget_ms = float(
+            budget_ms if budget_ms is not None
+            else os.getenv('REDACTION_RULE_BUDGET_MS', DEFAULT_RULE_BUDGET_MS)
+        )
+        self.fallback = fallback or os.getenv('REDACTION_RULE_FALLBACK', 'line')
+        if self.fallback not in FALLBACK_MODES:
+            raise ValueError(f"Unknown redaction fallback '{self.fallback}', expected one of {FALLBACK_MODES}")
+        self.stats = RuleStats()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._last_check = 0.0
+        self.ruleset = None
+
+        # Fail fast on startup - a worker must never run without rules
+        self.reload(raise_errors=True)
+
+    @property
+    def rules(self) -> List[RedactionRule]:
+        return self.ruleset.rules
+
+    def _rule_files(self) -> List[Path]:
+        return sorted(self.rules_dir.glob("*.yaml"))
+
+    def _current_fingerprint(self, files: List[Path]) -> Tuple:
+        return tuple((f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in files)
+
+    def reload(self, raise_errors: bool = False) -> bool:
+        """
+        Recompile the rule files and swap them in
+
+        A broken rule file keeps the previous rule set active.
+
+        Returns:
+            True if a new rule set was loaded
+        """
+        with self._lock:
+            try:
+                files = self._rule_files()
+                if not files:
+                    raise ValueError(f"No rule files found in {self.rules_dir}")
+                fingerprint = self._current_fingerprint(files)
+                ruleset = load_rule_files(files)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                # Don't retry the same broken files on every document
+                self._fingerprint = self._safe_fingerprint()
+                logger.error(f"✗ Redaction rules reload failed, keeping {self.ruleset.version}: {str(e)}")
+                return False
+
+            self._fingerprint = fingerprint
+            self.ruleset = ruleset
+
+        logger.info(f"✓ Redaction engine compiled {len(ruleset.rules)} rules ({ruleset.version})")
+        return True
+
+    def _safe_fingerprint(self) -> Optional[Tuple]:
+        try:
+            return self._current_fingerprint(self._rule_files())
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """Reload the rule files if any of them changed, at most once per check_interval"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        if self._safe_fingerprint() != self._fingerprint:
+            logger.info("🔄 Redaction rule files changed, reloading...")
+            self.reload()
+
+    def redact(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Redact text in one pass over the original string
+
+        Returns:
+            (redacted_text, spans) where spans are dicts with the offset and
+            length in the original text plus the rule category and label,
+            sorted by offset
+        """
+        spans = self.match_spans(text)
+        return self.render(text, spans), span_map(spans)
+
+    def match_spans(
+        self,
+        text: str,
+        reserved: int = 0,
+        before: Optional[int] = None
+    ) -> List[Tuple[int, int, RedactionRule]]:
+        """
+        Find the non-overlapping redaction spans in text
+
+        Every active rule is matched against the original text in priority
+        order and each character goes to the highest-priority rule matching
+        it. A match touching earlier spans is retried on the text as the
+        substitution cascade this replaced saw it, with markers in place of
+        those spans, and redacts the free text that retry covers (see
+        _overlapped_pieces). PII the cascade removed is never left behind,
+        and greedy label patterns don't swallow the body text between other
+        redactions.
+
+        Case-insensitive prefixes are searched in a lowercase copy of the
+        text, which only lines up with the text when it is ASCII; other text
+        falls back to plain regex scanning for those rules. Rules with
+        anchors only run if one of their keywords occurs in the text.
+
+        Args:
+            text: Text to scan
+            reserved: Length of a leading part already redacted elsewhere
+                (the overlap with a previous window). Matches resolve
+                against it like against any earlier span.
+            before: Only return the spans that settle text[:before] - those
+                starting before it, with every piece of their matches and
+                whatever starts before the end of those (a window's commit
+                point). All matches still take part in resolving overlaps.
+
+        Returns:
+            (start, end, rule) tuples sorted by start
+        """
+        self.reload_if_changed()
+        ruleset = self.ruleset
+
+        lowered = text.lower() if text.isascii() else None
+        present = ruleset.anchor_scanner.scan(text, lowered)
+
+        # One byte per character, set once a rule has claimed it
+        claimed = bytearray(len(text))
+        claimed[:reserved] = b'\x01' * reserved
+        # (start, end, rule, match number) - pieces of a split match share the number
+        spans = []
+        numbered = 0
+        samples = []
+        skipped = 0
+
+        for rule in ruleset.rules:
+            if rule.anchors and rule.anchors.isdisjoint(present):
+                skipped += 1
+                continue
+
+            haystack = lowered if rule.ignorecase else text
+            started = time.perf_counter()
+            matches, outcome = self._scan_rule(rule, text, haystack)
+            samples.append((rule.label, time.perf_counter() - started, len(matches), outcome))
+
+            for number, (start, end) in enumerate(matches, numbered):
+                # A match running into an earlier span may have run on past it in the cascade
+                if claimed.find(1, start, end + 1) < 0:
+                    pieces = [(start, end)]
+                else:
+                    pieces = _overlapped_pieces(rule, text, claimed, start, end)
+                for begin, stop in pieces:
+                    spans.append((begin, stop, rule, number))
+                    claimed[begin:stop] = b'\x01' * (stop - begin)
+            numbered += len(matches)
+
+        spans.sort(key=lambda span: span[0])
+
+        self.stats.record(samples)
+        logger.debug(f"Redaction prefilter skipped {skipped}/{len(ruleset.rules)} rules")
+        if before is not None:
+            spans = _settled(spans, before)
+        return [(start, end, rule) for start, end, rule, _ in spans]
+
+    @staticmethod
+    def render(
+        text: str,
+        spans: Sequence[Tuple[int, int, RedactionRule]],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> str:
+        """
+        Rebuild text[start:end] with every span replaced by its rule's marker
+
+        spans must be sorted, non-overlapping and lie within start:end.
+        """
+        pieces = []
+        last = start
+        previous = None
+        for begin, stop, rule in spans:
+            # Touching spans with the same marker read as one redaction
+            if not (begin == last and previous == rule.replacement):
+                pieces.append(text[last:begin])
+                pieces.append(rule.replacement)
+            last = stop
+            previous = rule.replacement
+        pieces.append(text[last:end])
+        return ''.join(pieces)
+
+    def _scan_rule(
+        self,
+        rule: RedactionRule,
+        text: str,
+        haystack: Optional[str]
+    ) -> Tuple[List[Tuple[int, int]], str]:
+        """
+        Collect one rule's matches within its time budget
+
+        Returns:
+            (matches, outcome) where outcome is "ok", "bounded" (finished in
+            line mode after running over budget) or "skipped" (rest of the
+            text not scanned)
+        """
+        budget_ms = rule.budget_ms if rule.budget_ms is not None else self.budget_ms
+        if not budget_ms:
+            return list(rule.finditer(text, haystack)), "ok"
+
+        matches = []
+        try:
+            deadline = time.perf_counter() + budget_ms / 1000
+            for match in rule.finditer(text, haystack, deadline=deadline):
+                matches.append(match)
+            return matches, "ok"
+        except RuleBudgetExceeded as e:
+            position = e.position
+
+        if self.fallback == "line":
+            logger.warning(
+                f"⚠ Redaction rule '{rule.label}' exceeded {budget_ms:g}ms at char {position}/{len(text)}, "
+                f"bounding the rest of the scan to single lines"
+            )
+            try:
+                deadline = time.perf_counter() + budget_ms / 1000
+                for match in rule.finditer(text, haystack, pos=position, deadline=deadline, bounded=True):
+                    matches.append(match)
+                return matches, "bounded"
+            except RuleBudgetExceeded as e:
+                position = e.position
+
+        logger.warning(
+            f"⚠ Redaction rule '{rule.label}' exceeded {budget_ms:g}ms, "
+            f"skipping it for the rest of the text (from char {position}/{len(text)})"
+        )
+        return matches, "skipped"
+
+    def slowest_rules(self, top: int = 10) -> Dict[str, Any]:
+        """Report of the rules that cost the most time across all scanned texts"""
+        return {
+            "version": self.ruleset.version,
+            "scans": self.stats.scans,
+            "budget_ms": self.budget_ms,
+            "fallback": self.fallback,
+            "rules": self.stats.report(top)
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the active rule set"""
+        ruleset = self.ruleset
+        return {
+            "version": ruleset.version,
+            "rules_dir": str(self.rules_dir),
+            "files": ruleset.sources,
+            "rule_count": len(ruleset.rules),
+            "anchor_keywords": len(ruleset.anchor_scanner.keywords),
+            "rules": [
+                {
+                    "label": rule.label,
+                    "category": rule.category,
+                    "priority": rule.priority,
+                    "anchors": sorted(rule.anchors),
+                    "budget_ms": rule.budget_ms if rule.budget_ms is not None else self.budget_ms
+                }
+                for rule in ruleset.rules
+            ]
+        }
@@ -0,0 +1,443 @@
+"""
+Summarizer Backends
+One interface for every way of producing a summary, and a registry the
+pipeline walks in order. Each backend has its own concurrency limit,
+timeout and capability flags.
+"""
+
+import os
+import re
+import time
+import random
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+from extractive_summary import textrank_summary
+from generation_batcher import generation_batcher, GenerationBatcher, HF_REQUEST_TIMEOUT, HF_MAX_INPUT_TOKENS
+from lm_studio_client import lm_studio, LMStudioClient, LM_STUDIO_READ_TIMEOUT
+from map_reduce_summary import SUMMARY_CONCURRENCY
+from model_registry import MISTRAL_MODEL
+from prompt_builder import prompt_builder, LM_STUDIO_CONTEXT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# AI backends tried in order, by registered name ("fake" for load tests,
+# "extractive"/"lead" to skip generation entirely)
+SUMMARY_BACKENDS = [name.strip() for name in os.getenv("SUMMARY_BACKENDS", "lm_studio,huggingface").split(",") if name.strip()]
+
+# Simulated generation time of the fake backend, and its random spread
+FAKE_SUMMARY_LATENCY_MS = float(os.getenv("FAKE_SUMMARY_LATENCY_MS", "500"))
+FAKE_SUMMARY_JITTER_MS = float(os.getenv("FAKE_SUMMARY_JITTER_MS", "0"))
+
+# Summary prompts, {text} is the cleaned (or map-reduced) report
+LM_STUDIO_SUMMARY_PROMPT = """You are a medical report analyzer. Generate a SHORT medical summary.
+
+⚠️ CRITICAL - NEVER INCLUDE:
+❌ Names (patient, doctor, beneficiary, worker)
+❌ Age, gender, physical measurements
+❌ Phone numbers, contact info
+❌ Addresses, locations, districts, pincodes
+❌ Registration numbers, IDs, report codes
+❌ Dates, times
+❌ Lab names, hospital locations
+
+✅ ONLY INCLUDE:
+• Medical test results (normal/abnormal ranges)
+• Important health findings
+• Recommendations for treatment
+
+📝 Write ONLY 1-2 SHORT paragraphs in simple language.
+
+Medical Report Data:
+{text}
+
+Generate medical summary focusing ONLY on test results and health recommendations. NO personal information."""
+
+HF_SUMMARY_PROMPT = """[INST] Medical report analyzer: Generate SHORT summary (1-2 paragraphs).
+
+⚠️ NEVER INCLUDE:
+❌ Names, age, gender
+❌ Phone, address, location
+❌ IDs, dates, report numbers
+
+✅ ONLY INCLUDE:
+• Test results (normal/abnormal)
+• Health findings
+• Recommendations
+
+Medical Data:
+{text}
+
+Generate summary with NO personal information.[/INST]"""
+
+# LM Studio summaries keep their fixed reply budget
+LM_STUDIO_SUMMARY_PARAMS = {"temperature": 0.7, "max_tokens": 300}
+
+# Plain instruction prompts (map-reduce chunk notes) run cooler
+COMPLETION_TEMPERATURE = 0.3
+
+
+def lead_summary(text: str, max_sentences: int = 5) -> str:
+    """First sentences of the text longer than 20 characters"""
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+
+    summary = '. '.join(sentences[:max_sentences])
+    if summary and not summary.endswith('.'):
+        summary += '.'
+    return summary
+
+
+class SummarizerBackend:
+    """
+    Base class for summarizer backends
+
+    Subclasses implement _summarize (and _complete if they can run plain
+    instruction prompts) and set the capability flags:
+      streaming  - passes tokens to on_token while generating
+      completion - runs arbitrary prompts (map-reduce chunk notes)
+      extractive - picks sentences from the text instead of generating
+      cacheable  - results may go in the persistent summary cache
+      batched    - queues and batches its own calls, so it is exempt from
+                   the process-wide llm_slots limit
+
+    summarize() and complete() wait at most `timeout` seconds for one of
+    the backend's max_concurrency slots (0 = unlimited) and pass the rest
+    of the timeout to the backend. They return None when the backend is
+    busy, unavailable or fails, so callers can move on to the next one.
+    LLM backends build their prompt with prompt_builder to fit
+    prompt_budget() tokens and report what it used through `usage`.
+    """
+
+    name = "base"
+    streaming = False
+    completion = False
+    extractive = False
+    cacheable = True
+    batched = False
+
+    def __init__(self, model: str, max_concurrency: int, timeout: float):
+        """
+        Args:
+            model: Model name reported in status and used in cache keys
+            max_concurrency: Calls running at once, 0 for no limit
+            timeout: Seconds per call, slot wait included
+        """
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self._stats_lock = threading.Lock()
+
+        # Counters for status reporting
+        self.calls = 0
+        self.failures = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+
+    def available(self) -> bool:
+        return True
+
+    def cache_params(self, max_tokens: int) -> Dict[str, Any]:
+        """Settings that change this backend's output (part of the cache key)"""
+        return {"max_tokens": max_tokens}
+
+    def prompt_budget(self, max_tokens: int) -> int:
+        """Prompt tokens this backend accepts with a reply of max_tokens"""
+        return 0
+
+    def summarize(
+        self,
+        text: str,
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Summarize text that fits one call
+
+        Args:
+            text: Cleaned (or map-reduced) report text
+            max_tokens: Reply token budget
+            on_token: Called with pieces of the summary as they are produced
+            usage: Filled with the backend, model and prompt token counts
+
+        Returns:
+            Summary, or None if the backend is busy, unavailable or failed
+        """
+        usage = {} if usage is None else usage
+        usage.update(backend=self.name, model=self.model, max_tokens=max_tokens)
+        return self._call(self._summarize, text, max_tokens, on_token, usage)
+
+    def complete(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Run a plain instruction prompt, None if unsupported or failed"""
+        if not self.completion:
+            return None
+        return self._call(self._complete, prompt, max_tokens)
+
+    def _call(self, method: Callable, *args) -> Optional[str]:
+        if not self.available():
+            return None
+
+        started = time.monotonic()
+        if self._slots is not None and not self._slots.acquire(timeout=self.timeout):
+            logger.warning(f"⏱ {self.name}: no free slot within {self.timeout:.0f}s, skipping")
+            with self._stats_lock:
+                self.busy += 1
+            return None
+
+        try:
+            remaining = max(self.timeout - (time.monotonic() - started), 0.001)
+            result = method(*args, timeout=remaining)
+        except Exception as e:
+            logger.warning(f"⚠ {self.name} summarizer error: {str(e) or type(e).__name__}")
+            result = None
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+        with self._stats_lock:
+            self.calls += 1
+            self.busy_seconds += time.monotonic() - started
+            if not result:
+                self.failures += 1
+        return result or None
+
+    def _summarize(
+        self,
+        text: str,
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]],
+        usage: Dict[str, Any],
+        timeout: float
+    ) -> Optional[str]:
+        raise NotImplementedError
+
+    def _complete(self, prompt: str, max_tokens: int, timeout: float) -> Optional[str]:
+        raise NotImplementedError
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "available": self.available(),
+            "capabilities": {
+                "streaming": self.streaming,
+                "completion": self.completion,
+                "extractive": self.extractive,
+                "cacheable": self.cacheable
+            },
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "calls": self.calls,
+            "failures": self.failures,
+            "busy": self.busy,
+            "mean_seconds": round(self.busy_seconds / self.calls, 3) if self.calls else None
+        }
+
+
+class OpenAICompatibleBackend(SummarizerBackend):
+    """Chat completions on an OpenAI-compatible local server (LM Studio)"""
+
+    streaming = True
+    completion = True
+
+    def __init__(
+        self,
+        name: str,
+        client: LMStudioClient,
+        prompt: str = LM_STUDIO_SUMMARY_PROMPT,
+        params: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = SUMMARY_CONCURRENCY,
+        timeout: float = LM_STUDIO_READ_TIMEOUT,
+        context_tokens: int = LM_STUDIO_CONTEXT_TOKENS
+    ):
+        super().__init__(client.model, max_concurrency, timeout)
+        self.name = name
+        self.client = client
+        self.context_tokens = context_tokens
+        self.prompt = prompt
+        self.params = params or LM_STUDIO_SUMMARY_PARAMS
+
+    def available(self) -> bool:
+        # False while the client's circuit is open
+        return self.client.available
+
+    def cache_params(self, max_tokens: int) -> Dict[str, Any]:
+        # The context size decides how much of a long report fits the prompt
+        return {**self.params, "context_tokens": self.context_tokens, "prompt_budget": self.prompt_budget(max_tokens)}
+
+    def prompt_budget(self, max_tokens: int) -> int:
+        # The reply budget sent is the fixed one in params
+        return self.context_tokens - self.params.get("max_tokens", max_tokens)
+
+    def _summarize(self, text, max_tokens, on_token, usage, timeout):
+        built = prompt_builder.build(self.prompt, text, self.prompt_budget(max_tokens))
+        usage.update(built.usage())
+        messages = [{"role": "user", "content": built.prompt}]
+        if on_token:
+            return self.client.stream_chat(messages, on_token, timeout=timeout, **self.params)
+        return self.client.chat(messages, timeout=timeout, **self.params)
+
+    def _complete(self, prompt, max_tokens, timeout):
+        messages = [{"role": "user", "content": prompt}]
+        return self.client.chat(messages, timeout=timeout, temperature=COMPLETION_TEMPERATURE, max_tokens=max_tokens)
+
+
+class HuggingFaceBackend(SummarizerBackend):
+    """Resident Hugging Face Mistral through the generation batcher"""
+
+    name = "huggingface"
+    streaming = True
+    completion = True
+    batched = True
+
+    def __init__(
+        self,
+        batcher: GenerationBatcher = generation_batcher,
+        prompt: str = HF_SUMMARY_PROMPT,
+        timeout: float = HF_REQUEST_TIMEOUT
+    ):
+        # The batcher queues requests itself, a slot per batch row keeps it full
+        super().__init__(MISTRAL_MODEL, batcher.batch_size, timeout)
+        self.batcher = batcher
+        self.prompt = prompt
+
+    def cache_params(self, max_tokens: int) -> Dict[str, Any]:
+        return {"max_new_tokens": max_tokens, "prompt_budget": self.prompt_budget(max_tokens), **self.batcher.generation_params}
+
+    def prompt_budget(self, max_tokens: int) -> int:
+        # Longer prompts would be truncated by the batcher, instructions first
+        return HF_MAX_INPUT_TOKENS
+
+    def _summarize(self, text, max_tokens, on_token, usage, timeout):
+        built = prompt_builder.build(self.prompt, text, self.prompt_budget(max_tokens))
+        usage.update(built.usage())
+        return self.batcher.generate(built.prompt, max_tokens, on_token, timeout=timeout)
+
+    def _complete(self, prompt, max_tokens, timeout):
+        return self.batcher.generate(f"[INST] {prompt} [/INST]", max_tokens, timeout=timeout)
+
+
+class ExtractiveBackend(SummarizerBackend):
+    """Picks sentences from the text with a plain function, no model needed"""
+
+    extractive = True
+    cacheable = False
+
+    def __init__(self, name: str, summarize: Callable[[str], str], model: str = "extractive"):
+        super().__init__(model, 0, 0)
+        self.name = name
+        self.summarize_text = summarize
+
+    def _summarize(self, text, max_tokens, on_token, usage, timeout):
+        summary = self.summarize_text(text)
+        if summary and on_token:
+            on_token(summary)
+        return summary
+
+
+class FakeBackend(SummarizerBackend):
+    """
+    Deterministic stand-in for load tests without a GPU or LM Studio
+
+    Waits latency_ms (plus up to jitter_ms) like a real generation, streams
+    the reply word by word over that time and returns the same summary for
+    the same text. Results are never cached.
+    """
+
+    name = "fake"
+    streaming = True
+    completion = True
+    cacheable = False
+
+    def __init__(
+        self,
+        latency_ms: float = FAKE_SUMMARY_LATENCY_MS,
+        jitter_ms: float = FAKE_SUMMARY_JITTER_MS,
+        max_concurrency: int = 0,
+        timeout: float = 60
+    ):
+        super().__init__("fake", max_concurrency, timeout)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+
+    def cache_params(self, max_tokens: int) -> Dict[str, Any]:
+        return {"max_tokens": max_tokens, "latency_ms": self.latency * 1000}
+
+    def _reply(self, text: str, max_tokens: int, on_token: Optional[Callable[[str], None]], timeout: float) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        words = text.split()[:max(max_tokens // 2, 1)]
+        reply = f"[fake summary {digest}] " + " ".join(words[:40])
+
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"fake latency {delay:.2f}s over the {timeout:.2f}s timeout")
+
+        pieces = reply.split(" ")
+        for i, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            if on_token:
+                on_token(piece if i == 0 else " " + piece)
+        return reply
+
+    def _summarize(self, text, max_tokens, on_token, usage, timeout):
+        return self._reply(text, max_tokens, on_token, timeout)
+
+    def _complete(self, prompt, max_tokens, timeout):
+        return self._reply(prompt, max_tokens, None, timeout)
+
+
+class SummarizerRegistry:
+    """Registered backends by name, and the order the pipeline tries them in"""
+
+    def __init__(self, order: List[str] = SUMMARY_BACKENDS):
+        self._lock = threading.Lock()
+        self._backends: Dict[str, SummarizerBackend] = {}
+        self.order = list(order)
+        self._unknown = set()
+
+    def register(self, backend: SummarizerBackend, replace: bool = False):
+        """
+        Add a backend under backend.name
+
+        Raises:
+            ValueError: If the name is taken and replace is False
+        """
+        with self._lock:
+            if backend.name in self._backends and not replace:
+                raise ValueError(f"Summarizer backend already registered: {backend.name}")
+            self._backends[backend.name] = backend
+
+    def get(self, name: str) -> Optional[SummarizerBackend]:
+        return self._backends.get(name)
+
+    def chain(self) -> List[SummarizerBackend]:
+        """Configured AI backends in order, skipping unknown names and unavailable backends"""
+        backends = []
+        for name in self.order:
+            backend = self._backends.get(name)
+            if backend is None:
+                if name not in self._unknown:
+                    self._unknown.add(name)
+                    logger.warning(f"⚠ Unknown summarizer backend in SUMMARY_BACKENDS: {name}")
+            elif backend.available():
+                backends.append(backend)
+        return backends
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "order": self.order,
+            "backends": {name: backend.status() for name, backend in self._backends.items()}
+        }
+
+
+# Shared by every DocumentProcessor in the process
+summarizer_registry = SummarizerRegistry()
+summarizer_registry.register(OpenAICompatibleBackend("lm_studio", lm_studio))
+summarizer_registry.register(HuggingFaceBackend())
+summarizer_registry.register(ExtractiveBackend("extractive", textrank_summary, model="textrank"))
+summarizer_registry.register(ExtractiveBackend("lead", lead_summary, model="lead"))
+summarizer_registry.register(FakeBackend())
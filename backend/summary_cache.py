@@ -0,0 +1,204 @@
+"""
+Persistent Summary Cache
+Finished AI summaries stored encrypted in SQLite, keyed by the cleaned text,
+backend, model, prompt version and generation parameters, so re-processing
+the same report skips the LLM
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from cryptography.exceptions import InvalidTag
+
+from encryption_utils import ZeroKnowledgeEncryption, get_encryption_key
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_DB = os.getenv("SUMMARY_CACHE_DB", "summary_cache.db")
+
+# Summaries kept before the least recently used are evicted (0 disables the cache)
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+
+
+def prompt_version(*templates: str) -> str:
+    """Short fingerprint of prompt templates, changes whenever any of them is edited"""
+    digest = hashlib.sha256()
+    for template in templates:
+        digest.update(template.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class SummaryCache:
+    """
+    Encrypted LRU summary cache on SQLite
+
+    Only the key hash and timestamps are stored in the clear; the summary
+    itself is AES-256-GCM encrypted with the result encryption key. Rows
+    written under another prompt version are dropped on startup.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        db_path: str = SUMMARY_CACHE_DB,
+        max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+        encryption_key: Optional[bytes] = None
+    ):
+        """
+        Args:
+            version: Prompt version (see prompt_version), part of every key
+            db_path: SQLite file
+            max_entries: Summaries kept, least recently used evicted first
+            encryption_key: 32-byte AES-256 key (the result key by default)
+        """
+        self.version = version
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.key = encryption_key or get_encryption_key()
+        self.crypto = ZeroKnowledgeEncryption()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self.init_database()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Processing threads write concurrently, wait for the lock instead of failing
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def init_database(self):
+        """Create the table and drop summaries from other prompt versions"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                cache_key TEXT PRIMARY KEY,
+                prompt_version TEXT,
+                backend TEXT,
+                model TEXT,
+                encrypted_summary TEXT,
+                created_at REAL,
+                last_used REAL,
+                hits INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache (last_used)")
+        cursor.execute("DELETE FROM summary_cache WHERE prompt_version != ?", (self.version,))
+        if cursor.rowcount:
+            logger.info(f"🧹 Summary cache: dropped {cursor.rowcount} summaries from older prompt versions")
+        conn.commit()
+        conn.close()
+
+    def make_key(self, text: str, backend: str, model: str, params: Dict[str, Any]) -> str:
+        """Hash of everything that determines the summary"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        material = json.dumps(
+            {"text": text_hash, "backend": backend, "model": model, "prompt": self.version, "params": params},
+            sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, backend: str, model: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Look up a cached summary
+
+        Returns:
+            Summary text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        cache_key = self.make_key(text, backend, model, params)
+        summary = None
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute("SELECT encrypted_summary FROM summary_cache WHERE cache_key = ?", (cache_key,))
+            row = cursor.fetchone()
+            if row:
+                try:
+                    summary = self.crypto.decrypt_data(row[0], self.key)["summary"]
+                    cursor.execute(
+                        "UPDATE summary_cache SET last_used = ?, hits = hits + 1 WHERE cache_key = ?",
+                        (time.time(), cache_key)
+                    )
+                except (InvalidTag, ValueError, KeyError):
+                    # Written under another encryption key, unusable
+                    cursor.execute("DELETE FROM summary_cache WHERE cache_key = ?", (cache_key,))
+                conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            # A broken cache must never cost the summary, treat it as a miss
+            logger.warning(f"⚠ Summary cache read failed: {str(e)}")
+
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    def put(self, text: str, backend: str, model: str, params: Dict[str, Any], summary: str):
+        """Store a summary and evict the least recently used beyond max_entries"""
+        if not self.enabled or not summary:
+            return
+
+        cache_key = self.make_key(text, backend, model, params)
+        encrypted = self.crypto.encrypt_data({"summary": summary}, self.key)
+        now = time.time()
+
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO summary_cache
+                (cache_key, prompt_version, backend, model, encrypted_summary, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            """, (cache_key, self.version, backend, model, encrypted, now, now))
+            cursor.execute("""
+                DELETE FROM summary_cache WHERE cache_key NOT IN (
+                    SELECT cache_key FROM summary_cache ORDER BY last_used DESC LIMIT ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠ Summary cache write failed: {str(e)}")
+
+    def clear(self) -> int:
+        """Delete every cached summary, returns how many were removed"""
+        if not self.enabled:
+            return 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM summary_cache")
+        removed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return removed
+
+    def status(self) -> Dict[str, Any]:
+        entries = 0
+        if self.enabled:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0]
+            conn.close()
+        return {
+            "enabled": self.enabled,
+            "prompt_version": self.version,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,141 @@
+"""
+Summary Token Streams
+Forwards AI summary tokens from the processing thread to API clients as
+they are generated, keyed by task ID. Tokens live in memory only - the
+finished summary is encrypted and stored as before.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Finished streams are kept this long so late subscribers get a replay
+CLOSED_STREAM_TTL_SECONDS = 60
+
+
+class _Stream:
+    def __init__(self):
+        self.events = []            # (event, data) so far, replayed to new subscribers
+        self.subscribers = set()    # (loop, asyncio.Queue)
+        self.closed_at = None
+
+
+class SummaryStreamHub:
+    """
+    In-memory pub/sub of summary tokens per task
+
+    The processing thread publishes; async subscribers (the SSE endpoint)
+    get every event published so far and then live events. Event types:
+      token - a piece of generated text
+      reset   - generation restarted on another backend, drop tokens so far
+      summary - a summary version was stored, data is {"version", "provisional"};
+                a provisional one is followed by the AI tokens and its replacement
+      done    - generation finished, data is the task status
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams: Dict[str, _Stream] = {}
+
+    def open(self, task_id: str):
+        """Start a stream so clients can subscribe before generation starts"""
+        with self._lock:
+            self._prune()
+            self._streams.setdefault(task_id, _Stream())
+
+    def publish(self, task_id: str, token: str):
+        self._emit(task_id, "token", token)
+
+    def reset(self, task_id: str):
+        self._emit(task_id, "reset", None)
+
+    def stored(self, task_id: str, version: int, provisional: bool):
+        self._emit(task_id, "summary", {"version": version, "provisional": provisional})
+
+    def close(self, task_id: str, status: str):
+        self._emit(task_id, "done", status)
+        with self._lock:
+            stream = self._streams.get(task_id)
+            if stream is not None:
+                stream.closed_at = time.monotonic()
+
+    def discard(self, task_id: str):
+        """Drop a stream and its buffered tokens (results were deleted)"""
+        with self._lock:
+            self._streams.pop(task_id, None)
+
+    def has_stream(self, task_id: str) -> bool:
+        return task_id in self._streams
+
+    def _emit(self, task_id: str, event: str, data: Any):
+        with self._lock:
+            stream = self._streams.get(task_id)
+            if stream is None or stream.closed_at is not None:
+                return
+            if event == "reset":
+                # New subscribers don't need the discarded attempt
+                stream.events.clear()
+            stream.events.append((event, data))
+            subscribers = list(stream.subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+            except RuntimeError:
+                # Subscriber's event loop is gone
+                pass
+
+    def _prune(self):
+        # Called with the lock held
+        now = time.monotonic()
+        expired = [
+            task_id for task_id, stream in self._streams.items()
+            if stream.closed_at is not None and now - stream.closed_at > CLOSED_STREAM_TTL_SECONDS
+        ]
+        for task_id in expired:
+            del self._streams[task_id]
+
+    async def subscribe(self, task_id: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield (event, data) for a task until its done event
+
+        Yields nothing if the task has no stream.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            stream = self._streams.get(task_id)
+            if stream is None:
+                return
+            backlog = list(stream.events)
+            subscriber = (loop, queue)
+            if stream.closed_at is None:
+                stream.subscribers.add(subscriber)
+
+        try:
+            for event, data in backlog:
+                yield event, data
+                if event == "done":
+                    return
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event == "done":
+                    return
+        finally:
+            with self._lock:
+                stream.subscribers.discard(subscriber)
+
+    def status(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "streams": len(self._streams),
+                "subscribers": sum(len(s.subscribers) for s in self._streams.values())
+            }
+
+
+# Shared by the processing pipeline and the API
+summary_streams = SummaryStreamHub()
@@ -0,0 +1,11 @@
+"""
+Shared test setup
+Tests run from backend/ or the repository root, modules are imported like the server does
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
@@ -0,0 +1,50 @@
+"""
+LM Studio client tests
+Malformed replies raise LMStudioError and count against the circuit breaker
+"""
+
+import httpx
+import pytest
+
+from lm_studio_client import LMStudioClient, LMStudioError
+
+MESSAGES = [{"role": "user", "content": "Summarize"}]
+
+
+def make_client(body, content_type="text/event-stream"):
+    client = LMStudioClient(base_url="http://lm-studio.test", failure_threshold=5)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body, headers={"content-type": content_type}))
+    client._client = httpx.Client(base_url=client.base_url, transport=transport)
+    return client
+
+
+def sse(*events):
+    return "".join(f"data: {event}\n\n" for event in events).encode("utf-8")
+
+
+def test_stream_chat_joins_deltas():
+    chunk = '{"choices": [{"delta": {"content": "%s"}}]}'
+    client = make_client(sse(chunk % "Low ", chunk % "haemoglobin", "[DONE]"))
+    tokens = []
+
+    assert client.stream_chat(MESSAGES, tokens.append) == "Low haemoglobin"
+    assert tokens == ["Low ", "haemoglobin"]
+    assert client.breaker.failures == 0
+
+
+@pytest.mark.parametrize("event", ['{"choices": [{"delta": ', '{"error": "model unloaded"}', '{"choices": []}'])
+def test_stream_chat_malformed_chunk(event):
+    client = make_client(sse('{"choices": [{"delta": {"content": "Low"}}]}', event, "[DONE]"))
+
+    with pytest.raises(LMStudioError):
+        client.stream_chat(MESSAGES, lambda token: None)
+    assert client.breaker.failures == 1
+    assert client.breaker.last_error.startswith("malformed stream chunk")
+
+
+def test_chat_malformed_reply():
+    client = make_client(b"<html>proxy error</html>", content_type="text/html")
+
+    with pytest.raises(LMStudioError):
+        client.chat(MESSAGES)
+    assert client.breaker.failures == 1
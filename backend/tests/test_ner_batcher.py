@@ -0,0 +1,138 @@
+"""
+NER batcher tests
+Chunks must tile the document and stay within nlp.max_length, and batched
+requests must come back to the right caller, in order
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from ner_batcher import NERBatcher, split_for_ner, CHUNK_OVERLAP_CHARS, SENTENCE_SEARCH_CHARS
+from synthetic_reports import generate_report
+
+
+def check_chunks(text, chunk_chars, overlap=CHUNK_OVERLAP_CHARS):
+    chunks = list(split_for_ner(text, chunk_chars, overlap))
+    bound = chunk_chars + 2 * overlap + SENTENCE_SEARCH_CHARS
+
+    # Owned ranges tile the text, each inside its chunk
+    assert chunks[0][2] == 0 and chunks[-1][3] == len(text)
+    for (_, _, _, own_end), (_, _, own_start, _) in zip(chunks, chunks[1:]):
+        assert own_end == own_start
+    for start, end, own_start, own_end in chunks:
+        assert start <= own_start < own_end <= end
+        assert end - start <= bound
+    return chunks
+
+
+@pytest.mark.parametrize("chunk_chars", [1_000, 10_000])
+def test_report_chunks_are_bounded(chunk_chars):
+    check_chunks(generate_report(100_000), chunk_chars)
+
+
+def test_text_without_spaces_is_bounded():
+    # A long run with no space after the first chunk used to read to the end of the document
+    text = "Haemoglobin is low. " * 100 + "x" * 200_000
+    chunks = check_chunks(text, 1_000)
+    assert len(chunks) > 100
+
+
+def test_chunk_fits_nlp_max_length():
+    # NERBatcher splits with chunk_chars = nlp.max_length // 2
+    max_length = 20_000
+    text = ("word " * 5_000) + "y" * 100_000 + " tail"
+    for start, end, _, _ in check_chunks(text, max_length // 2):
+        assert end - start <= max_length
+
+
+_NAME = re.compile(r'[A-Z][a-z]+')
+
+
+def fake_entities(text):
+    return [(m.group(), "PERSON", m.start(), m.end()) for m in _NAME.finditer(text)]
+
+
+class FakeNLP:
+    """Stands in for spaCy: every capitalized word is a PERSON"""
+
+    max_length = 1_000_000
+
+    def __init__(self):
+        self.batches = []
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.batches.append(len(texts))
+        if "boom" in texts:
+            raise RuntimeError("pipeline failed")
+        for text in texts:
+            ents = [SimpleNamespace(text=t, label_=label, start_char=a, end_char=b) for t, label, a, b in fake_entities(text)]
+            yield SimpleNamespace(ents=ents)
+
+
+class FakeRegistry:
+    spacy_model = "fake"
+
+    def __init__(self):
+        self.nlp = FakeNLP()
+
+    def get_spacy(self):
+        return self.nlp
+
+
+def run_concurrently(batcher, requests):
+    # Callers start together so their texts share batches
+    barrier = threading.Barrier(len(requests))
+
+    def call(texts):
+        barrier.wait()
+        return batcher.extract(texts, timeout=5)
+
+    with ThreadPoolExecutor(len(requests)) as pool:
+        return [pool.submit(call, texts) for texts in requests]
+
+
+def test_concurrent_callers_get_their_own_entities():
+    registry = FakeRegistry()
+    batcher = NERBatcher(registry, batch_size=16, max_wait_ms=50)
+    requests = [[f"Patient Caller{i} seen by Doctor{j}" for j in range(i % 3 + 1)] for i in range(8)]
+
+    futures = run_concurrently(batcher, requests)
+
+    for texts, future in zip(requests, futures):
+        assert future.result() == [fake_entities(text) for text in texts]
+    # Texts of different callers went through shared pipe calls
+    assert len(registry.nlp.batches) < sum(len(texts) for texts in requests)
+
+
+def test_extract_document_offsets_refer_to_the_document():
+    batcher = NERBatcher(FakeRegistry(), batch_size=4, max_wait_ms=1, chunk_chars=300)
+    text = " ".join(f"Result {i} reviewed by Nasre and Kulkarni." for i in range(200))
+
+    # More chunks than batch_size, so several waves run
+    assert len(list(split_for_ner(text, 300))) > 4
+    assert list(batcher.extract_document(text, timeout=5)) == fake_entities(text)
+
+
+def test_pipe_failure_reaches_every_waiting_caller():
+    registry = FakeRegistry()
+    batcher = NERBatcher(registry, batch_size=16, max_wait_ms=200)
+    requests = [["boom"]] + [[f"Patient Caller{i}"] for i in range(5)]
+
+    futures = run_concurrently(batcher, requests)
+
+    # Every caller returns: the failing batch raises, nobody hangs until the timeout
+    with pytest.raises(RuntimeError, match="pipeline failed"):
+        futures[0].result()
+    for texts, future in zip(requests[1:], futures[1:]):
+        if future.exception() is None:
+            assert future.result() == [fake_entities(texts[0])]
+        else:
+            assert isinstance(future.exception(), RuntimeError)
+
+    # The worker keeps serving after a failed batch
+    assert batcher.extract(["Doctor Nasre"], timeout=5) == [fake_entities("Doctor Nasre")]
@@ -0,0 +1,139 @@
+"""
+Redaction engine tests
+Prefix jumps and the anchor prefilter must find exactly what plain regex does,
+and the span map must redact everything the old substitution cascade did
+"""
+
+import random
+import re
+
+import pytest
+
+from redaction_engine import RedactionEngine, RedactionRule, RuleSet
+from synthetic_reports import generate_page, generate_report
+
+FILLER = [
+    "Name", "name", "Dr.", "DR ", "age", "AGE", "Page No - 3", "Phone", "mobile", "India",
+    "12/11/2025", "49Y/FEMALE", "9876543210", "+919876543210", "440037", "a@b.co",
+    "Height (cm) Height (cm) : : 150", "MD  Pathology", "ſample", "İndia", "é"
+]
+ALPHABET = "aeiouAEIOU :\n0123456789/-.()+@[]YDrMNxX"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # No time budget, so a slow CI machine can't switch rules to bounded mode
+    return RedactionEngine(budget_ms=0)
+
+
+def fuzz_texts(engine, count=300, seed=1):
+    rnd = random.Random(seed)
+    words = FILLER + [p for rule in engine.rules for p in rule.prefixes] + [a for rule in engine.rules for a in rule.anchors]
+    words += [w.upper() for w in words] + [w.title() for w in words]
+    # Real label lines, so prefixes are followed by what their patterns expect
+    lines = [line for line in generate_report(20_000, seed=seed).splitlines() if line.strip()]
+    for _ in range(count):
+        parts = []
+        for _ in range(rnd.randint(1, 40)):
+            roll = rnd.random()
+            if roll < 0.3:
+                # Labels with their spacing squeezed, doubled or broken across lines
+                parts.append(re.sub(' ', lambda m: rnd.choice([" ", "", "\n", "  "]), rnd.choice(lines)))
+            elif roll < 0.7:
+                parts.append(rnd.choice(words))
+            else:
+                parts.append(''.join(rnd.choice(ALPHABET) for _ in range(rnd.randint(1, 8))))
+        yield ''.join(part + rnd.choice([" ", "\n", " : ", ":", ""]) for part in parts)
+
+
+def texts(engine):
+    yield from fuzz_texts(engine)
+    yield generate_report(50_000, seed=7)
+
+
+def plain_matches(rule, text):
+    return [(m.start(), m.end()) for m in rule.regex.finditer(text) if m.end() > m.start()]
+
+
+def test_prefix_scan_matches_plain_regex(engine):
+    for text in texts(engine):
+        lowered = text.lower() if text.isascii() else None
+        for rule in engine.rules:
+            haystack = lowered if rule.ignorecase else text
+            assert list(rule.finditer(text, haystack)) == plain_matches(rule, text), (rule.label, text)
+
+
+def test_anchor_scanner_matches_plain_search(engine):
+    scanner = engine.ruleset.anchor_scanner
+    for text in texts(engine):
+        expected = {k for k in scanner.keywords if re.search(re.escape(k), text, re.IGNORECASE)}
+        assert scanner.scan(text) == expected, text
+
+
+def test_anchor_prefilter_only_skips_rules_without_matches(engine):
+    scanner = engine.ruleset.anchor_scanner
+    for text in texts(engine):
+        present = scanner.scan(text)
+        for rule in engine.rules:
+            if rule.anchors and rule.anchors.isdisjoint(present):
+                assert plain_matches(rule, text) == [], (rule.label, text)
+
+
+def test_spans_match_plain_regex_engine(engine):
+    plain = RedactionEngine(budget_ms=0)
+    rules = [
+        RedactionRule(rule.label, rule.pattern, rule.replacement, rule.category, rule.priority, ignorecase=rule.ignorecase)
+        for rule in engine.rules
+    ]
+    plain.ruleset = RuleSet(rules, "plain", {})
+
+    for text in texts(engine):
+        got = [(start, end, rule.label) for start, end, rule in engine.match_spans(text)]
+        expected = [(start, end, rule.label) for start, end, rule in plain.match_spans(text)]
+        assert got == expected, text
+
+
+def cascade_redacted(rules, text):
+    """Offsets in text that the old cascade of re.sub calls replaced"""
+    # Offset in text of every char of the cascade output, -1 for marker chars
+    origin = list(range(len(text)))
+    current = text
+    redacted = set()
+    for rule in rules:
+        parts, mapped, last = [], [], 0
+        for match in rule.regex.finditer(current):
+            parts.append(current[last:match.start()])
+            mapped.extend(origin[last:match.start()])
+            redacted.update(i for i in origin[match.start():match.end()] if i >= 0)
+            parts.append(rule.replacement)
+            mapped.extend([-1] * len(rule.replacement))
+            last = match.end()
+        parts.append(current[last:])
+        mapped.extend(origin[last:])
+        current, origin = ''.join(parts), mapped
+    return redacted
+
+
+def joined_pages(count, seed=0):
+    # OCR often runs label lines together
+    rnd = random.Random(seed)
+    for page in range(count):
+        text = generate_page(random.Random(page), page + 1)
+        yield re.sub('\n', lambda m: ' ' if rnd.random() < 0.5 else '\n', text)
+
+
+def test_joined_lines_keep_cascade_redactions(engine):
+    text = ("Dr. Nitesh Nasre Processed At : PLOT NO A/45,Back side of hotel, MIDC Hingna Nagpur "
+            "Customer Name : MBOCWWB D2D Camp / 748 / Nagpur urban")
+    redacted, _ = engine.redact(text)
+    assert redacted.startswith("[DOCTOR-REDACTED] At : [LAB-LOCATION-REDACTED]")
+    assert "Nagpur" not in redacted and "Hingna" not in redacted
+
+
+def test_no_cascade_redaction_left_unredacted(engine):
+    for text in joined_pages(200):
+        covered = bytearray(len(text))
+        for start, end, _ in engine.match_spans(text):
+            covered[start:end] = b'\x01' * (end - start)
+        leaked = sorted(i for i in cascade_redacted(engine.rules, text) if not covered[i] and text[i].isalnum())
+        assert not leaked, text[leaked[0] - 40:leaked[0] + 40]
@@ -0,0 +1,140 @@
+"""
+Structured data scanner tests
+The single-pass scanner must agree with the old per-pattern extractor, and
+bulk extraction must give the same records in order for any process count
+"""
+
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from models.regex_patterns import IndianDataExtractor, scanner
+from synthetic_reports import generate_report
+
+_MONTH = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)'
+
+# The extractor before the single-pass scanner: one re.findall per pattern
+LEGACY_PATTERNS = {
+    "phone": ([r'\+?91[-\s]?[6-9]\d{9}', r'\(?\d{2,4}\)?[-\s]?\d{6,8}', r'\b[6-9]\d{9}\b'], re.IGNORECASE),
+    "aadhaar": ([r'\b\d{4}\s\d{4}\s\d{4}\b', r'\b\d{4}-\d{4}-\d{4}\b', r'\b\d{12}\b'], 0),
+    "date": ([
+        r'\b\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}\b',
+        r'\b\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}\b',
+        rf'\b\d{{1,2}}\s+{_MONTH}\s+\d{{4}}\b',
+        rf'\b{_MONTH}\s+\d{{1,2}},?\s+\d{{4}}\b'
+    ], re.IGNORECASE)
+}
+
+FRAGMENTS = [
+    "+91-9876543210", "9876543210", "011-12345678", "(022) 2345678", "1234 5678 9012", "1234-5678-9012",
+    "123456789012", "15/01/2024", "2024-01-15", "25 December 1990", "15 jan 2024", "Jan 5, 2024",
+    "January 15 2024", "12.12.2024", "31.02.2023", " ", "\n", ":", "a", "-", "0", "7"
+]
+
+
+def legacy_spans(text):
+    return {
+        (kind, m.start(), m.end())
+        for kind, (patterns, flags) in LEGACY_PATTERNS.items()
+        for pattern in patterns
+        for m in re.finditer(pattern, text, flags)
+    }
+
+
+def legacy_mask_aadhaar(text):
+    for pattern in LEGACY_PATTERNS["aadhaar"][0]:
+        text = re.sub(pattern, lambda m: 'X' * 8 + m.group()[-4:], text)
+    return text
+
+
+def fuzz_texts(count=1000, seed=3):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 20)))
+
+
+@pytest.mark.parametrize("size", [3_000, 200_000])
+def test_reports_match_legacy_extractor(size):
+    text = generate_report(size, seed=size)
+    extractor = IndianDataExtractor()
+    found = extractor.extract_all(text)
+    legacy = {kind: {text[s:e] for k, s, e in legacy_spans(text) if k == kind} for kind in LEGACY_PATTERNS}
+
+    assert set(found["aadhaar_numbers"]) == legacy["aadhaar"]
+    assert set(found["dates"]) == legacy["date"]
+    # Phones only lose 12-digit numbers, which are now reported once as Aadhaar
+    dropped = legacy["phone"] - set(found["phone_numbers"])
+    assert set(found["phone_numbers"]) <= legacy["phone"]
+    assert all(re.fullmatch(r'\d{12}', phone) for phone in dropped)
+
+    # Every scanner match is one a legacy pattern found too
+    assert {(m.kind, m.start, m.end) for m in scanner.scan(text)} <= legacy_spans(text)
+    assert extractor.mask_aadhaar(text) == legacy_mask_aadhaar(text)
+
+
+def test_only_overlapping_legacy_matches_are_dropped():
+    for text in fuzz_texts():
+        spans = [(m.kind, m.start, m.end) for m in scanner.scan(text)]
+        for kind, start, end in legacy_spans(text) - set(spans):
+            assert any(s < end and start < e for _, s, e in spans), (text, kind, text[start:end])
+
+
+def test_extract_all_in_document_order():
+    text = "Expiry: 2025-12-31, born 25 December 1990, call 9123456789 or +91-9876543210"
+    assert IndianDataExtractor().extract_all(text) == {
+        "phone_numbers": ["9123456789", "+91-9876543210"],
+        "aadhaar_numbers": [],
+        "dates": ["2025-12-31", "25 December 1990"]
+    }
+
+
+def bulk_texts(count=120):
+    # Mixed sizes so workers finish out of order
+    rnd = random.Random(5)
+    return [
+        generate_report(rnd.choice([500, 3_000, 20_000]), seed=i) if i % 7 else "".join(rnd.choice(FRAGMENTS) for _ in range(30))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("processes,chunksize", [(2, 1), (3, 4)])
+def test_extract_many_order_matches_inline(processes, chunksize):
+    extractor = IndianDataExtractor()
+    texts = bulk_texts()
+
+    # Small chunks span several input windows
+    inline = list(extractor.extract_many(texts, processes=1))
+    pooled = list(extractor.extract_many(texts, processes=processes, chunksize=chunksize))
+
+    assert [record["id"] for record in inline] == [str(i) for i in range(len(texts))]
+    assert pooled == inline
+
+
+def test_extract_many_keeps_ids_and_errors_in_order():
+    extractor = IndianDataExtractor()
+    items = [(f"doc-{i}", text) for i, text in enumerate(bulk_texts(40))]
+    items.insert(17, ("missing", Path("/nonexistent/report.txt")))
+
+    inline = list(extractor.extract_many(items, processes=1))
+    pooled = list(extractor.extract_many(items, processes=2, chunksize=3))
+
+    assert [record["id"] for record in pooled] == [doc_id for doc_id, _ in items]
+    assert "error" in pooled[17]
+    assert pooled == inline
+
+
+def test_extract_directory_matches_inline(tmp_path):
+    for i, text in enumerate(bulk_texts(30)):
+        path = tmp_path / f"ward-{i % 3}" / f"report-{i:03d}.txt"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    extractor = IndianDataExtractor()
+    inline = list(extractor.extract_directory(tmp_path, processes=1))
+    pooled = list(extractor.extract_directory(tmp_path, processes=2, chunksize=2))
+
+    assert len(inline) == 30
+    assert [record["id"] for record in inline] == sorted(record["id"] for record in inline)
+    assert pooled == inline
@@ -0,0 +1,68 @@
+"""
+Streaming cleaner tests
+Windowed cleaning must give exactly the single-pass result
+"""
+
+import re
+
+import pytest
+
+from redaction_engine import RedactionEngine
+from synthetic_reports import generate_report
+from text_cleaner import StreamingCleaner, RepeatedLineFilter, clean_lines, iter_lines, MAX_LINE_CHARS
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return RedactionEngine()
+
+
+def clean(engine, text, window_chars):
+    cleaner = StreamingCleaner(engine, window_chars=window_chars, overlap_chars=min(4096, window_chars // 2))
+    chunks, redactions = [], []
+    for chunk, chunk_redactions in cleaner.clean(iter_lines(text)):
+        if chunk:
+            chunks.append(chunk)
+        redactions.extend(chunk_redactions)
+    return ' '.join(chunks), redactions
+
+
+@pytest.mark.parametrize("size", [3_000, 60_000, 400_000])
+def test_streamed_matches_single_pass(engine, size):
+    text = generate_report(size, seed=size)
+    single = clean(engine, text, len(text) + 1)
+    for window_chars in (8 * 1024, 64 * 1024, 256 * 1024):
+        assert clean(engine, text, window_chars) == single
+
+
+def test_long_lines_match_single_pass(engine):
+    # OCR output without line breaks, longer than a window and MAX_LINE_CHARS
+    text = generate_report(3 * MAX_LINE_CHARS, seed=7).replace('\n', ' ')
+    single = clean(engine, text, len(text) + 1)
+    for window_chars in (8 * 1024, 64 * 1024):
+        assert clean(engine, text, window_chars) == single
+
+
+def test_lab_rows_survive_header_removal(engine):
+    text = generate_report(200_000)
+    cleaned, _ = clean(engine, text, 256 * 1024)
+    row = re.compile(r'HAEMOGLOBIN\s+\d+\.\d\s+g/dL 12\.0 - 15\.0')
+    assert len(row.findall(cleaned)) == len(row.findall(text))
+    # Letterhead kept on the first pages only
+    assert cleaned.count("Welfare Board") == 2
+
+
+def test_repeated_line_filter_keeps_body_lines():
+    repeats = RepeatedLineFilter(edge_lines=2)
+    kept = []
+    for page in range(5):
+        kept += repeats.feed(["HEAD", f"value {page}", "same body line", f"result {page}", "FOOT"])
+    kept += repeats.flush()
+    # Header/footer gone from page 3 on, the repeated body line never
+    assert kept.count("HEAD") == 2 and kept.count("FOOT") == 2
+    assert kept.count("same body line") == 5
+
+
+def test_removed_characters_leave_single_spaces():
+    lines = clean_lines("Total Cholesterol 131 mg/dL < 200\nHbA1c   ★ 6.1 %  ≤ 5.7\n")
+    assert lines == ["Total Cholesterol 131 mg/dL 200", "HbA1c 6.1 5.7"]
@@ -0,0 +1,347 @@
+"""
+Text cleaning helpers for the text cleaning node
+Repeated page header/footer removal, line by line
+Streaming cleaner that works through large documents in bounded windows
+"""
+
+import re
+import math
+import logging
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+from redaction_engine import span_map
+
+logger = logging.getLogger(__name__)
+
+# Lines at the top and bottom of a page checked for headers/footers
+PAGE_EDGE_LINES = 30
+
+# Share of earlier pages a line must have been a header/footer on
+MIN_PAGE_SHARE = 0.5
+
+# Header/footer lines remembered per document
+MAX_KNOWN_SEGMENTS = 10000
+
+# Streaming cleaner window and overlap (chars of raw text)
+DEFAULT_WINDOW_CHARS = 256 * 1024
+DEFAULT_OVERLAP_CHARS = 4 * 1024
+
+# Lines longer than this (OCR output without line breaks) are cut at a space
+MAX_LINE_CHARS = 64 * 1024
+
+# Per-line normalization
+_LINE_SPACE = re.compile(r'[^\S\n]+')
+_SPECIAL_CHARS = re.compile(r'[^\w\s.,!?;:()\-\'\"/]')
+_DOTS = re.compile(r'\.{3,}')
+_DASHES = re.compile(r'\-{2,}')
+_DIGIT = re.compile(r'\d')
+
+
+class RepeatedLineFilter:
+    """
+    Removes page headers and footers as whole lines
+
+    A page starts at the first line of the document (the letterhead) and at
+    every later copy of it. The header is the run of lines from the top of
+    a page, the footer the run from the bottom, each at most edge_lines
+    long; a run ends at the first line that isn't a known header/footer, so
+    lab rows and other content in between are never touched. A line is
+    known once it has been on the edge of min_count - 1 earlier pages and of
+    at least half of them; from then on it is dropped, earlier copies stay.
+
+    Lines are fed in order, across as many calls as needed: every decision
+    depends only on the lines before, and only the current page's last
+    edge_lines are held back, so streamed and single-pass output match.
+    """
+
+    def __init__(self, edge_lines: int = PAGE_EDGE_LINES, min_count: int = 3, min_page_share: float = MIN_PAGE_SHARE):
+        """
+        Args:
+            edge_lines: Lines at each end of a page that can be header/footer
+            min_count: Pages a header/footer appears on before copies are dropped
+            min_page_share: Share of earlier pages it must have appeared on
+        """
+        self.edge_lines = edge_lines
+        self.min_count = min_count
+        self.min_page_share = min_page_share
+        self.anchor = None
+        self.pages = 0                                  # Pages finished so far
+        self.head_pages: Dict[str, int] = {}            # Line -> pages it was in the top edge of
+        self.foot_pages: Dict[str, int] = {}            # Line -> pages it was in the bottom edge of
+        self.removed = 0
+        self._start_page()
+
+    def _start_page(self):
+        self.position = 0
+        self.in_header = True
+        self.page_head = set()
+        self.tail = deque()                             # [line, dropped], last edge_lines of the page
+
+    def _threshold(self) -> int:
+        return max(self.min_count - 1, math.ceil(self.min_page_share * self.pages), 1)
+
+    def feed(self, lines: Iterable[str]) -> List[str]:
+        """Add lines in document order, returns the lines that are settled and kept"""
+        kept = []
+        for line in lines:
+            if self.anchor is None:
+                self.anchor = line
+            elif line == self.anchor:
+                kept.extend(self._end_page())
+
+            dropped = False
+            if self.position < self.edge_lines:
+                self.page_head.add(line)
+                if self.in_header and self.head_pages.get(line, 0) >= self._threshold():
+                    dropped = True
+                else:
+                    self.in_header = False
+            self.position += 1
+
+            self.tail.append([line, dropped])
+            if len(self.tail) > self.edge_lines:
+                line, dropped = self.tail.popleft()
+                self._keep(kept, line, dropped)
+        return kept
+
+    def flush(self) -> List[str]:
+        """End of document: settle the last page"""
+        kept = self._end_page()
+        if self.removed:
+            logger.info(f"✓ Removed {self.removed} repeated header/footer lines")
+        return kept
+
+    def _keep(self, kept: List[str], line: str, dropped: bool):
+        if dropped:
+            self.removed += 1
+        else:
+            kept.append(line)
+
+    def _end_page(self) -> List[str]:
+        # Footer run, bottom up; header lines it reaches are part of it
+        threshold = self._threshold()
+        for entry in reversed(self.tail):
+            if not entry[1]:
+                if self.foot_pages.get(entry[0], 0) < threshold:
+                    break
+                entry[1] = True
+
+        # Every distinct edge line counts once per page, dropped or not
+        for known, lines in ((self.head_pages, self.page_head), (self.foot_pages, {line for line, _ in self.tail})):
+            for line in lines:
+                if line in known:
+                    known[line] += 1
+                elif len(known) < MAX_KNOWN_SEGMENTS:
+                    known[line] = 1
+        self.pages += 1
+
+        kept = []
+        for line, dropped in self.tail:
+            self._keep(kept, line, dropped)
+        self._start_page()
+        return kept
+
+
+def break_long_line(line: str, complete: bool = True) -> Tuple[List[str], str]:
+    """
+    Cut a line into pieces of at most MAX_LINE_CHARS, at the last space before the limit
+
+    Pieces are taken greedily from the start, so they are the same whether
+    the line arrives whole or a window at a time.
+
+    Returns:
+        (pieces, rest) where rest is the unsettled end of an incomplete line
+        ('' when complete)
+    """
+    pieces = []
+    while len(line) > MAX_LINE_CHARS:
+        cut = line.rfind(' ', 0, MAX_LINE_CHARS + 1)
+        cut = cut + 1 if cut > 0 else MAX_LINE_CHARS
+        pieces.append(line[:cut])
+        line = line[cut:]
+    if complete:
+        pieces.append(line)
+        line = ''
+    return pieces, line
+
+
+def iter_lines(text: str, max_chars: int = DEFAULT_WINDOW_CHARS) -> Iterator[str]:
+    """
+    Yield the lines of text, newline included, without copying it whole
+
+    Lines longer than max_chars (OCR output without line breaks) are
+    yielded in max_chars pieces.
+    """
+    pos = 0
+    while pos < len(text):
+        end = text.find('\n', pos, pos + max_chars)
+        end = min(len(text), pos + max_chars) if end < 0 else end + 1
+        yield text[pos:end]
+        pos = end
+
+
+def clean_lines(text: str) -> List[str]:
+    """
+    Normalize a block of redacted text and return its non-noise lines
+
+    Special characters are removed and whitespace runs within lines
+    collapse to one space. Lines that are only separator characters, or
+    three characters or fewer without a digit, are dropped (values such as
+    "9.5" on their own line are kept).
+    """
+    # Special characters go first, so the spaces around them collapse too
+    text = _SPECIAL_CHARS.sub('', text)
+    text = _LINE_SPACE.sub(' ', text)
+    text = _DOTS.sub('...', text)
+    text = _DASHES.sub('-', text)
+
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or all(c in '.-_=*#@' for c in line):
+            continue
+        if len(line) <= 3 and line not in ('.', '!', '?') and not _DIGIT.search(line):
+            continue
+        lines.append(line)
+    return lines
+
+
+class StreamingCleaner:
+    """
+    Cleans a document in bounded windows of lines
+
+    Raw text is redacted one window at a time. Each window carries the last
+    overlap_chars of the previous one, so patterns that cross lines or the
+    window edge still match; only spans starting before the overlap are
+    committed, the rest is scanned again with the next window. Redacted
+    text is split into lines, cleaned line by line, and every window is
+    emitted as one chunk after repeated header/footer removal (the last
+    lines of a page wait for the next chunk, until it is known whether they
+    are a footer). Memory stays bounded by the window size however large
+    the document is.
+    """
+
+    def __init__(
+        self,
+        redaction_engine,
+        window_chars: int = DEFAULT_WINDOW_CHARS,
+        overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+        repeat_edge_lines: int = PAGE_EDGE_LINES,
+        repeat_min_count: int = 3
+    ):
+        """
+        Args:
+            redaction_engine: RedactionEngine used for every window
+            window_chars: Raw chars redacted per window
+            overlap_chars: Chars carried into the next window; a redaction
+                match can run at most this far past the committed text
+            repeat_edge_lines: Lines at each end of a page that can be header/footer
+            repeat_min_count: Pages a header/footer appears on before copies are dropped
+        """
+        if overlap_chars >= window_chars:
+            raise ValueError("overlap_chars must be smaller than window_chars")
+        self.redaction_engine = redaction_engine
+        self.window_chars = window_chars
+        self.overlap_chars = overlap_chars
+        self.repeat_edge_lines = repeat_edge_lines
+        self.repeat_min_count = repeat_min_count
+
+    def clean(self, lines: Iterable[str]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Clean a document given as lines (newlines included, e.g. a text file)
+
+        Yields:
+            (chunk, redactions) per window. Chunks are single-spaced text to be
+            joined with ' '; redaction offsets refer to the whole raw document.
+        """
+        repeats = RepeatedLineFilter(self.repeat_edge_lines, self.repeat_min_count)
+        partial = ''      # Redacted text of an unfinished line
+        carry = ''        # Raw text scanned again with the next window
+        offset = 0        # Raw document offset of carry
+        emitted = 0       # Leading chars of carry already redacted and emitted
+        pending = []
+        pending_chars = 0
+
+        for line in lines:
+            pending.append(line)
+            pending_chars += len(line)
+            if len(carry) + pending_chars < self.window_chars:
+                continue
+
+            window = carry + ''.join(pending)
+            pending = []
+            pending_chars = 0
+
+            redacted, redactions, commit, emitted = self._redact_window(window, offset, emitted, final=False)
+            carry = window[commit:]
+            offset += commit
+
+            chunk, partial = self._clean_lines(partial + redacted, repeats, final=False)
+            yield chunk, redactions
+
+        window = carry + ''.join(pending)
+        redacted, redactions, _, _ = self._redact_window(window, offset, emitted, final=True)
+        chunk, _ = self._clean_lines(partial + redacted, repeats, final=True)
+        yield chunk, redactions
+
+    def _redact_window(
+        self,
+        window: str,
+        offset: int,
+        emitted: int,
+        final: bool
+    ) -> Tuple[str, List[Dict[str, Any]], int, int]:
+        """
+        Redact a window and emit the part of it that is settled
+
+        The window is committed up to the last line start before the
+        overlap. A span crossing that point is emitted whole, together with
+        the other pieces of its match and anything between them; the next
+        window still starts at the line start, with the emitted part of
+        the span reserved, so later rules see the same line context and
+        resolve overlaps as they would in a single pass.
+
+        Returns:
+            (redacted_text, redactions, commit, emitted) where the next window
+            starts at commit and its first emitted chars are already done
+        """
+        if final:
+            commit = end = len(window)
+            spans = self.redaction_engine.match_spans(window, reserved=emitted)
+        else:
+            limit = len(window) - self.overlap_chars
+            newline = window.rfind('\n', emitted, limit)
+            commit = max(newline + 1 if newline >= 0 else limit, emitted)
+            spans = self.redaction_engine.match_spans(window, reserved=emitted, before=commit)
+            end = max([commit] + [span[1] for span in spans])
+
+        redacted = self.redaction_engine.render(window, spans, emitted, end)
+        return redacted, span_map(spans, offset), commit, end - commit
+
+    def _clean_lines(self, text: str, repeats: RepeatedLineFilter, final: bool) -> Tuple[str, str]:
+        """
+        Clean the complete lines of text
+
+        Returns:
+            (chunk, remainder) where remainder is the trailing unfinished line
+        """
+        if final:
+            remainder = ''
+        else:
+            cut = text.rfind('\n') + 1
+            text, remainder = text[:cut], text[cut:]
+            # The unfinished line can't grow past MAX_LINE_CHARS, full pieces are settled
+            pieces, remainder = break_long_line(remainder, complete=False)
+            if pieces:
+                text += '\n'.join(pieces) + '\n'
+
+        if len(text) > MAX_LINE_CHARS:
+            # Cut long complete lines the same way, wherever the window ended
+            text = '\n'.join(piece for line in text.split('\n') for piece in break_long_line(line)[0])
+
+        # Headers/footers go before the lines are joined, always as whole lines
+        kept = repeats.feed(clean_lines(text))
+        if final:
+            kept.extend(repeats.flush())
+        return ' '.join(kept), remainder